@@ -32,13 +32,13 @@ export function AgentMarketplace() {
 
     try {
       setIsCreating(true);
-      await agentApi.createAgentInstance({
+      const instance = await agentApi.createAgentInstance({
         agent_type_id: selectedAgent.id,
         name: newInstanceName.trim(),
       });
       setSelectedAgent(null);
       setNewInstanceName('');
-      alert('Agent Instance가 생성되었습니다. API Key를 확인하세요.');
+      alert(`Agent Instance가 생성되었습니다.\nAPI Key: ${instance.api_key}\n이 키는 다시 표시되지 않으니 지금 복사해 두세요.`);
     } catch (err) {
       alert(err instanceof Error ? err.message : 'Agent Instance 생성 실패');
     } finally {
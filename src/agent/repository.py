@@ -1,10 +1,12 @@
 """Agent Repository - 데이터베이스 접근"""
-import json
 import uuid
 from typing import Any
 
 import aiosqlite
 
+from src.shared import json_utils
+from src.shared.auth import api_key_hint, hash_api_key
+
 
 class AgentRepository:
     """Agent 관련 데이터베이스 작업"""
@@ -39,8 +41,8 @@ class AgentRepository:
                 description,
                 developer_id,
                 version,
-                json.dumps(config_schema) if config_schema else None,
-                json.dumps(capabilities) if capabilities else None,
+                json_utils.dumps(config_schema) if config_schema else None,
+                json_utils.dumps(capabilities) if capabilities else None,
                 public_scope,
                 project_id,
             ),
@@ -62,11 +64,11 @@ class AgentRepository:
         agent_type = dict(row)
         # JSON 필드 파싱
         if agent_type.get("config_schema"):
-            agent_type["config_schema"] = json.loads(agent_type["config_schema"])
+            agent_type["config_schema"] = json_utils.loads(agent_type["config_schema"])
         if agent_type.get("capabilities"):
             try:
-                agent_type["capabilities"] = json.loads(agent_type["capabilities"])
-            except (json.JSONDecodeError, TypeError):
+                agent_type["capabilities"] = json_utils.loads(agent_type["capabilities"])
+            except (json_utils.JSONDecodeError, TypeError):
                 agent_type["capabilities"] = []
         else:
             agent_type["capabilities"] = []
@@ -78,10 +80,15 @@ class AgentRepository:
         developer_id: str | None = None,
         is_public: bool | None = None,
         status: str | None = None,
+        visible_to: str | None = None,
         limit: int = 100,
         offset: int = 0,
     ) -> list[dict[str, Any]]:
-        """Agent Type 목록 조회"""
+        """Agent Type 목록 조회
+
+        visible_to가 주어지면 해당 사용자가 볼 수 있는 타입만 반환한다.
+        (본인 개발 / 전체 공개 / 같은 부서 / 프로젝트 멤버 — SQL 한 번으로 판정)
+        """
         query = "SELECT * FROM agent_types WHERE 1=1"
         params = []
         
@@ -97,22 +104,46 @@ class AgentRepository:
             query += " AND status = ?"
             params.append(status)
         
+        if visible_to:
+            query += """
+                AND (
+                    developer_id = ?
+                    OR public_scope = 'public'
+                    OR (public_scope = 'department' AND EXISTS (
+                        SELECT 1 FROM users me
+                        JOIN users dev ON dev.department_id = me.department_id
+                        WHERE me.id = ? AND dev.id = agent_types.developer_id
+                    ))
+                    OR (public_scope = 'project' AND project_id IS NOT NULL AND EXISTS (
+                        SELECT 1 FROM project_members
+                        WHERE project_id = agent_types.project_id AND user_id = ?
+                    ))
+                    OR (public_scope = 'project' AND project_id IS NULL AND EXISTS (
+                        SELECT 1 FROM project_members me
+                        JOIN project_members dev ON dev.project_id = me.project_id
+                        WHERE me.user_id = ? AND dev.user_id = agent_types.developer_id
+                    ))
+                )"""
+            params.extend([visible_to] * 4)
+        
         query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
         cursor = await self.db.execute(query, params)
         rows = await cursor.fetchall()
         
-        # JSON 필드 파싱
+        # JSON 필드 파싱 (컬럼 값은 행당 한 번만 읽음)
         agent_types = []
         for row in rows:
             agent_type = dict(row)
-            if agent_type.get("config_schema"):
-                agent_type["config_schema"] = json.loads(agent_type["config_schema"])
-            if agent_type.get("capabilities"):
+            config_schema = agent_type["config_schema"]
+            if config_schema:
+                agent_type["config_schema"] = json_utils.loads(config_schema)
+            capabilities = agent_type["capabilities"]
+            if capabilities:
                 try:
-                    agent_type["capabilities"] = json.loads(agent_type["capabilities"])
-                except (json.JSONDecodeError, TypeError):
+                    agent_type["capabilities"] = json_utils.loads(capabilities)
+                except (json_utils.JSONDecodeError, TypeError):
                     agent_type["capabilities"] = []
             else:
                 agent_type["capabilities"] = []
@@ -133,7 +164,7 @@ class AgentRepository:
             if value is not None:
                 if key in ["config_schema", "capabilities"]:
                     updates.append(f"{key} = ?")
-                    params.append(json.dumps(value))
+                    params.append(json_utils.dumps(value))
                 else:
                     updates.append(f"{key} = ?")
                     params.append(value)
@@ -169,28 +200,34 @@ class AgentRepository:
         config: dict | None = None,
         webhook_url: str | None = None,
     ) -> dict[str, Any]:
-        """Agent Instance 생성"""
+        """Agent Instance 생성
+
+        평문 API Key는 저장하지 않고(해시 + 표시용 접두사만 저장) 반환값에만 한 번 담는다.
+        """
         instance_id = str(uuid.uuid4())
         api_key = f"sk_{uuid.uuid4().hex}"
         
         await self.db.execute(
             """
-            INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, config, webhook_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, api_key_hash, config, webhook_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 instance_id,
                 agent_type_id,
                 name,
                 owner_id,
-                api_key,
-                json.dumps(config) if config else None,
+                api_key_hint(api_key),
+                hash_api_key(api_key),
+                json_utils.dumps(config) if config else None,
                 webhook_url,
             ),
         )
         await self.db.commit()
         
-        return await self.get_agent_instance(instance_id)
+        instance = await self.get_agent_instance(instance_id)
+        instance["api_key"] = api_key
+        return instance
 
     async def get_agent_instance(self, instance_id: str) -> dict[str, Any] | None:
         """Agent Instance 조회"""
@@ -206,17 +243,18 @@ class AgentRepository:
         # JSON 필드 파싱
         if instance.get("config"):
             try:
-                instance["config"] = json.loads(instance["config"])
-            except (json.JSONDecodeError, TypeError):
+                instance["config"] = json_utils.loads(instance["config"])
+            except (json_utils.JSONDecodeError, TypeError):
                 instance["config"] = None
         
         return instance
 
     async def get_agent_instance_by_api_key(self, api_key: str) -> dict[str, Any] | None:
-        """API Key로 Agent Instance 조회"""
+        """API Key로 Agent Instance 조회 (api_key_hash 인덱스 조회)"""
+        key_hash = hash_api_key(api_key)
         cursor = await self.db.execute(
-            "SELECT * FROM agent_instances WHERE api_key = ?",
-            (api_key,),
+            "SELECT * FROM agent_instances WHERE api_key_hash = ?",
+            (key_hash,),
         )
         row = await cursor.fetchone()
         if not row:
@@ -226,8 +264,8 @@ class AgentRepository:
         # JSON 필드 파싱
         if instance.get("config"):
             try:
-                instance["config"] = json.loads(instance["config"])
-            except (json.JSONDecodeError, TypeError):
+                instance["config"] = json_utils.loads(instance["config"])
+            except (json_utils.JSONDecodeError, TypeError):
                 instance["config"] = None
         
         return instance
@@ -266,10 +304,11 @@ class AgentRepository:
         instances = []
         for row in rows:
             instance = dict(row)
-            if instance.get("config"):
+            config = instance["config"]
+            if config:
                 try:
-                    instance["config"] = json.loads(instance["config"])
-                except (json.JSONDecodeError, TypeError):
+                    instance["config"] = json_utils.loads(config)
+                except (json_utils.JSONDecodeError, TypeError):
                     instance["config"] = None
             instances.append(instance)
         
@@ -288,7 +327,7 @@ class AgentRepository:
             if value is not None:
                 if key == "config":
                     updates.append(f"{key} = ?")
-                    params.append(json.dumps(value))
+                    params.append(json_utils.dumps(value))
                 else:
                     updates.append(f"{key} = ?")
                     params.append(value)
@@ -306,12 +345,14 @@ class AgentRepository:
         return await self.get_agent_instance(instance_id)
 
     async def regenerate_api_key(self, instance_id: str) -> str:
-        """API Key 재발급"""
+        """API Key 재발급 (평문은 반환값으로만 전달, DB에는 해시 + 표시용 접두사)"""
         new_api_key = f"sk_{uuid.uuid4().hex}"
         
         await self.db.execute(
-            "UPDATE agent_instances SET api_key = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (new_api_key, instance_id),
+            """UPDATE agent_instances
+               SET api_key = ?, api_key_hash = ?, updated_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            (api_key_hint(new_api_key), hash_api_key(new_api_key), instance_id),
         )
         await self.db.commit()
         
@@ -336,8 +377,9 @@ class AgentRepository:
         internal_user_id: str,
         external_user_id: str | None = None,
         metadata: dict | None = None,
+        commit: bool = True,
     ) -> dict[str, Any]:
-        """Agent 데이터 생성"""
+        """Agent 데이터 생성 (commit=False면 호출자가 커밋)"""
         data_id = str(uuid.uuid4())
         
         await self.db.execute(
@@ -352,13 +394,64 @@ class AgentRepository:
                 internal_user_id,
                 data_type,
                 content,
-                json.dumps(metadata) if metadata else None,
+                json_utils.dumps(metadata) if metadata else None,
             ),
         )
-        await self.db.commit()
+        if commit:
+            await self.db.commit()
         
         return await self.get_agent_data(data_id)
 
+    async def create_agent_data_many(
+        self,
+        rows: list[dict[str, Any]],
+        commit: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Agent 데이터 일괄 생성 (executemany 1회, 입력 순서대로 반환)
+
+        rows: agent_instance_id, data_type, content, internal_user_id,
+        external_user_id, metadata 키를 가진 dict 목록
+        """
+        data_ids = [str(uuid.uuid4()) for _ in rows]
+        await self.db.executemany(
+            """
+            INSERT INTO agent_data (id, agent_instance_id, external_user_id, internal_user_id, data_type, content, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    data_id,
+                    row["agent_instance_id"],
+                    row.get("external_user_id"),
+                    row["internal_user_id"],
+                    row["data_type"],
+                    row["content"],
+                    json_utils.dumps(row["metadata"]) if row.get("metadata") else None,
+                )
+                for data_id, row in zip(data_ids, rows)
+            ],
+        )
+        if commit:
+            await self.db.commit()
+
+        if not data_ids:
+            return []
+        placeholders = ",".join("?" * len(data_ids))
+        cursor = await self.db.execute(
+            f"SELECT * FROM agent_data WHERE id IN ({placeholders})",
+            data_ids,
+        )
+        by_id = {}
+        for row in await cursor.fetchall():
+            data = dict(row)
+            if data.get("metadata"):
+                try:
+                    data["metadata"] = json_utils.loads(data["metadata"])
+                except (json_utils.JSONDecodeError, TypeError):
+                    data["metadata"] = None
+            by_id[data["id"]] = data
+        return [by_id[data_id] for data_id in data_ids]
+
     async def get_agent_data(self, data_id: str) -> dict[str, Any] | None:
         """Agent 데이터 조회"""
         cursor = await self.db.execute(
@@ -373,8 +466,8 @@ class AgentRepository:
         # JSON 필드 파싱
         if data.get("metadata"):
             try:
-                data["metadata"] = json.loads(data["metadata"])
-            except (json.JSONDecodeError, TypeError):
+                data["metadata"] = json_utils.loads(data["metadata"])
+            except (json_utils.JSONDecodeError, TypeError):
                 data["metadata"] = None
         
         return data
@@ -411,8 +504,8 @@ class AgentRepository:
             data = dict(row)
             if data.get("metadata"):
                 try:
-                    data["metadata"] = json.loads(data["metadata"])
-                except (json.JSONDecodeError, TypeError):
+                    data["metadata"] = json_utils.loads(data["metadata"])
+                except (json_utils.JSONDecodeError, TypeError):
                     data["metadata"] = None
             data_list.append(data)
         
@@ -735,17 +828,40 @@ class AgentRepository:
         agent_instance_id: str,
         event_type: str,
         payload: str,
+        next_attempt_at: str | None = None,
     ) -> dict:
-        """Webhook 이벤트 생성"""
+        """Webhook 이벤트 생성 (next_attempt_at이 없으면 전송 대상이 아님)"""
         event_id = str(uuid.uuid4())
         await self.db.execute(
-            """INSERT INTO webhook_events (id, agent_instance_id, event_type, payload)
-               VALUES (?, ?, ?, ?)""",
-            (event_id, agent_instance_id, event_type, payload),
+            """INSERT INTO webhook_events (id, agent_instance_id, event_type, payload, next_attempt_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            (event_id, agent_instance_id, event_type, payload, next_attempt_at),
         )
         await self.db.commit()
         return await self.get_webhook_event(event_id)
 
+    async def create_webhook_events(
+        self,
+        agent_instance_id: str,
+        events: list[tuple[str, str]],
+        next_attempt_at: str | None = None,
+    ) -> list[str]:
+        """Webhook 이벤트 일괄 생성 (executemany 1회, 커밋 1회) — 입력 순서대로 이벤트 ID 반환
+
+        events: (event_type, payload) 목록
+        """
+        event_ids = [str(uuid.uuid4()) for _ in events]
+        await self.db.executemany(
+            """INSERT INTO webhook_events (id, agent_instance_id, event_type, payload, next_attempt_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            [
+                (event_id, agent_instance_id, event_type, payload, next_attempt_at)
+                for event_id, (event_type, payload) in zip(event_ids, events)
+            ],
+        )
+        await self.db.commit()
+        return event_ids
+
     async def get_webhook_event(self, event_id: str) -> dict | None:
         """Webhook 이벤트 조회"""
         cursor = await self.db.execute(
@@ -757,8 +873,8 @@ class AgentRepository:
         data = dict(row)
         if data.get("payload"):
             try:
-                data["payload"] = json.loads(data["payload"])
-            except (json.JSONDecodeError, TypeError):
+                data["payload"] = json_utils.loads(data["payload"])
+            except (json_utils.JSONDecodeError, TypeError):
                 pass
         return data
 
@@ -768,14 +884,15 @@ class AgentRepository:
         status: str,
         attempts: int,
         response_status: int | None = None,
+        next_attempt_at: str | None = None,
     ) -> None:
-        """Webhook 이벤트 상태 업데이트"""
+        """Webhook 이벤트 상태 업데이트 (next_attempt_at: 다음 재시도 시각, None이면 종료)"""
         await self.db.execute(
             """UPDATE webhook_events
                SET status = ?, attempts = ?, last_attempt_at = CURRENT_TIMESTAMP,
-                   response_status = ?
+                   response_status = ?, next_attempt_at = ?
                WHERE id = ?""",
-            (status, attempts, response_status, event_id),
+            (status, attempts, response_status, next_attempt_at, event_id),
         )
         await self.db.commit()
 
@@ -798,27 +915,30 @@ class AgentRepository:
             data = dict(row)
             if data.get("payload"):
                 try:
-                    data["payload"] = json.loads(data["payload"])
-                except (json.JSONDecodeError, TypeError):
+                    data["payload"] = json_utils.loads(data["payload"])
+                except (json_utils.JSONDecodeError, TypeError):
                     pass
             events.append(data)
         return events
 
-    async def get_pending_webhook_events(self, max_attempts: int = 3) -> list[dict]:
-        """미처리 webhook 이벤트 조회"""
+    async def get_due_webhook_events(self, now: str, limit: int = 100) -> list[dict]:
+        """재시도 시각이 도래한 webhook 이벤트 조회 (인스턴스 webhook_url 포함)"""
         cursor = await self.db.execute(
-            """SELECT * FROM webhook_events
-               WHERE status IN ('pending', 'failed') AND attempts < ?
-               ORDER BY created_at ASC LIMIT 50""",
-            (max_attempts,),
+            """SELECT e.*, i.webhook_url FROM webhook_events e
+               JOIN agent_instances i ON i.id = e.agent_instance_id
+               WHERE e.status IN ('pending', 'failed')
+                 AND e.next_attempt_at IS NOT NULL AND e.next_attempt_at <= ?
+                 AND i.webhook_url IS NOT NULL
+               ORDER BY e.next_attempt_at ASC LIMIT ?""",
+            (now, limit),
         )
         events = []
         for row in await cursor.fetchall():
             data = dict(row)
             if data.get("payload"):
                 try:
-                    data["payload"] = json.loads(data["payload"])
-                except (json.JSONDecodeError, TypeError):
+                    data["payload"] = json_utils.loads(data["payload"])
+                except (json_utils.JSONDecodeError, TypeError):
                     pass
             events.append(data)
         return events
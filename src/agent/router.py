@@ -14,6 +14,7 @@ from src.agent.schemas import (
     AgentInstanceUpdate,
     AgentInstanceResponse,
     AgentDataCreate,
+    AgentDataBulkCreate,
     AgentDataResponse,
     AgentDataListResponse,
     AgentMemorySearchRequest,
@@ -283,6 +284,38 @@ async def receive_agent_data(
         raise HTTPException(status_code=403, detail=e.message)
 
 
+@router.post("/agents/{agent_id}/data/bulk", response_model=list[AgentDataResponse])
+async def receive_agent_data_bulk(
+    agent_id: str,
+    data: AgentDataBulkCreate,
+    x_api_key: str = Header(..., alias="X-API-Key"),
+    service: AgentService = Depends(get_agent_service),
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    """Agent 데이터 일괄 수신 (API Key 인증)"""
+    import time
+    start = time.time()
+    try:
+        results = await service.receive_agent_data_bulk(
+            api_key=x_api_key,
+            items=[item.model_dump() for item in data.items],
+        )
+        # API 로그 기록
+        elapsed_ms = int((time.time() - start) * 1000)
+        from src.agent.middleware import ApiLogRecorder
+        recorder = ApiLogRecorder(db)
+        await recorder.log(
+            agent_instance_id=results[0]["agent_instance_id"],
+            endpoint=f"/agents/{agent_id}/data/bulk",
+            method="POST",
+            status_code=200,
+            response_time_ms=elapsed_ms,
+        )
+        return results
+    except PermissionDeniedException as e:
+        raise HTTPException(status_code=403, detail=e.message)
+
+
 @router.get("/agent-instances/{instance_id}/data", response_model=list[AgentDataResponse])
 async def list_agent_data(
     instance_id: str,
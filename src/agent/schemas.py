@@ -65,7 +65,7 @@ class AgentInstanceResponse(AgentInstanceBase):
     id: str
     agent_type_id: str
     owner_id: str
-    api_key: str
+    api_key: str | None = None  # 생성/재발급 응답에서만 평문, 그 외에는 표시용 접두사
     status: Literal["active", "inactive"]
     rate_limit_per_minute: int = 60
     created_at: datetime
@@ -87,6 +87,10 @@ class AgentDataCreate(AgentDataBase):
     pass
 
 
+class AgentDataBulkCreate(BaseModel):
+    items: list[AgentDataCreate] = Field(..., min_length=1, max_length=500)
+
+
 class AgentDataResponse(AgentDataBase):
     id: str
     agent_instance_id: str
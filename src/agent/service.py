@@ -1,5 +1,11 @@
 """Agent Service - 비즈니스 로직"""
+import asyncio
+import heapq
 import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Any
 
@@ -7,25 +13,141 @@ import aiosqlite
 
 from src.agent.repository import AgentRepository
 from src.chat.repository import ChatRepository
+from src.document.repository import DocumentRepository
 from src.memory.repository import MemoryRepository
-from src.user.repository import UserRepository
+from src.shared.auth import hash_api_key
+from src.shared.embedding_cache import get_cached_embedding, provider_key, store_embedding
 from src.shared.exceptions import NotFoundException, PermissionDeniedException
-from src.shared.vector_store import upsert_vector, search_vectors
-from src.shared.providers import get_embedding_provider
+from src.shared.vector_store import upsert_vector, upsert_vectors, search_vectors, delete_vector
+from src.shared.providers import BaseEmbeddingProvider, get_embedding_provider
+
+logger = logging.getLogger(__name__)
 
 # 리랭킹 상수 (chat/service.py와 동일)
 SIMILARITY_ALPHA = 0.6
 RECENCY_BETA = 0.4
 RECENCY_DECAY_DAYS = 30
+_RECENCY_DECAY_INV = 1.0 / RECENCY_DECAY_DAYS
+
+# 벡터 검색 후보 수 = max(SEARCH_MIN_CANDIDATES, limit * SEARCH_OVERFETCH_FACTOR)
+# 중복/superseded 제거 후에도 limit개를 채우기 위한 여유분.
+# 값을 키우면 재현율은 오르지만 벡터 검색과 메모리/청크 배치 조회 비용도 함께 늘어난다.
+SEARCH_OVERFETCH_FACTOR = 2
+SEARCH_MIN_CANDIDATES = 3
+
+# 임베딩 LRU 캐시: (provider, 모델, 텍스트) → 벡터 (embedding_cache 테이블과 같은 키)
+EMBEDDING_CACHE_SIZE = 1024
+_embedding_cache: OrderedDict[tuple[str, str, str], list[float]] = OrderedDict()
+
+
+async def _embed_cached(
+    text: str,
+    db: aiosqlite.Connection | None = None,
+    provider: BaseEmbeddingProvider | None = None,
+) -> list[float]:
+    """임베딩 조회 (캐시 히트 시 provider 호출 생략)
+
+    키에 provider와 모델명을 포함하므로 둘 중 하나가 바뀌면 자연스럽게 무효화된다.
+    db를 넘기면 프로세스 캐시 미스 시 embedding_cache 테이블도 조회/저장한다
+    (저장분 커밋은 호출자의 커밋에 포함).
+    provider를 넘기지 않으면 기본 provider를 사용한다.
+    """
+    provider = provider or get_embedding_provider()
+    provider_name, model_name = provider_key(provider)
+    key = (provider_name, model_name, text)
+
+    vector = _embedding_cache.get(key)
+    if vector is not None:
+        _embedding_cache.move_to_end(key)
+        return vector
+
+    if db is not None:
+        vector = await get_cached_embedding(db, provider_name, model_name, text)
+    if vector is None:
+        vector = await provider.embed(text)
+        if db is not None:
+            await store_embedding(db, provider_name, model_name, text, vector)
+
+    _embedding_cache[key] = vector
+    if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+        _embedding_cache.popitem(last=False)
+    return vector
+
+
+async def _embed_many_cached(
+    texts: list[str],
+    db: aiosqlite.Connection | None = None,
+    provider: BaseEmbeddingProvider | None = None,
+) -> list[list[float]]:
+    """여러 텍스트 임베딩 — 캐시 미스분만 embed_batch 한 번으로 처리 (입력 순서 유지)"""
+    provider = provider or get_embedding_provider()
+    provider_name, model_name = provider_key(provider)
+
+    vectors: dict[str, list[float]] = {}
+    misses: list[str] = []
+    for text in dict.fromkeys(texts):
+        key = (provider_name, model_name, text)
+        vector = _embedding_cache.get(key)
+        if vector is None and db is not None:
+            vector = await get_cached_embedding(db, provider_name, model_name, text)
+        if vector is None:
+            misses.append(text)
+        else:
+            vectors[text] = vector
+
+    if misses:
+        for text, vector in zip(misses, await provider.embed_batch(misses)):
+            vectors[text] = vector
+            if db is not None:
+                await store_embedding(db, provider_name, model_name, text, vector)
+
+    for text, vector in vectors.items():
+        key = (provider_name, model_name, text)
+        _embedding_cache[key] = vector
+        _embedding_cache.move_to_end(key)
+    while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+        _embedding_cache.popitem(last=False)
+
+    return [vectors[text] for text in texts]
+
+
+# API Key 해석 TTL 캐시: (sha256(api_key), external_user_id) → (만료 시각, (instance, internal_user_id))
+# 평문 키를 프로세스 메모리에 남기지 않도록 다이제스트로 보관
+# 캐시는 프로세스 단위라 무효화도 현재 프로세스에만 적용된다. 워커가 여러 개면
+# 다른 워커에서는 재발급/비활성화/삭제된 키가 최대 TTL 동안 계속 허용될 수 있다.
+API_KEY_CACHE_TTL_SEC = 60.0
+API_KEY_CACHE_SIZE = 4096
+_api_key_cache: dict[tuple[bytes, str | None], tuple[float, tuple[dict[str, Any], str]]] = {}
+
+
+def invalidate_api_key_cache(instance_id: str) -> None:
+    """Agent Instance 변경 시 해당 인스턴스의 API Key 해석 결과 제거
+
+    반드시 DB 쓰기가 끝난 뒤 호출한다. 쓰기 전에 비우면 쓰기 도중의 동시 요청이
+    이전 행을 다시 캐시에 넣을 수 있다.
+    """
+    stale = [key for key, (_, (instance, _)) in _api_key_cache.items() if instance["id"] == instance_id]
+    for key in stale:
+        del _api_key_cache[key]
 
 
 class AgentService:
     """Agent 관련 비즈니스 로직"""
     
-    def __init__(self, db: aiosqlite.Connection):
+    def __init__(self, db: aiosqlite.Connection, embedder: BaseEmbeddingProvider | None = None):
         self.db = db
         self.repo = AgentRepository(db)
         self.memory_repo = MemoryRepository(db)
+        self.document_repo = DocumentRepository(db)
+        self.chat_repo = ChatRepository(db)
+        self._embedder = embedder
+
+    @property
+    def embedder(self) -> BaseEmbeddingProvider:
+        """임베딩 provider (주입되지 않았으면 첫 사용 시 기본 provider로 고정)"""
+        if self._embedder is None:
+            self._embedder = get_embedding_provider()
+        return self._embedder
 
     # ==================== Agent Type ====================
 
@@ -68,46 +190,15 @@ class AgentService:
         limit: int = 100,
         offset: int = 0,
     ) -> list[dict[str, Any]]:
-        """Agent Type 목록 조회"""
-        agent_types = await self.repo.list_agent_types(
+        """Agent Type 목록 조회 (user_id가 있으면 공개 범위에 따라 필터링)"""
+        return await self.repo.list_agent_types(
             developer_id=developer_id,
             is_public=is_public,
             status=status,
+            visible_to=user_id,
             limit=limit,
             offset=offset,
         )
-        
-        # 사용자 ID가 있으면 공개 범위에 따른 필터링
-        if user_id:
-            filtered_types = []
-            for agent_type in agent_types:
-                # 개발자 본인은 항상 볼 수 있음
-                if agent_type["developer_id"] == user_id:
-                    filtered_types.append(agent_type)
-                    continue
-                
-                # 공개 범위에 따른 접근 권한 체크
-                if agent_type["public_scope"] == "public":
-                    # 전체 공개: 모든 사용자 접근 가능
-                    filtered_types.append(agent_type)
-                elif agent_type["public_scope"] == "department":
-                    # 부서 공개: 같은 부서 사용자만 접근 가능
-                    if await self._check_same_department(user_id, agent_type["developer_id"]):
-                        filtered_types.append(agent_type)
-                elif agent_type["public_scope"] == "project":
-                    # 프로젝트 공개: 지정된 프로젝트 멤버만 접근 가능
-                    if agent_type["project_id"]:
-                        if await self._check_project_member(user_id, agent_type["project_id"]):
-                            filtered_types.append(agent_type)
-                    else:
-                        # project_id가 없으면 같은 프로젝트 멤버 체크
-                        if await self._check_shared_project(user_id, agent_type["developer_id"]):
-                            filtered_types.append(agent_type)
-                # private는 개발자만 접근 가능 (위에서 이미 처리)
-            
-            return filtered_types
-        
-        return agent_types
 
     async def update_agent_type(
         self,
@@ -172,6 +263,20 @@ class AgentService:
         
         return instance
 
+    async def _get_owned_agent_instance(
+        self,
+        instance_id: str,
+        user_id: str,
+        denied_message: str,
+    ) -> dict[str, Any]:
+        """소유자 전용 작업용 Agent Instance 조회 (공유 권한 조회 없이 소유자만 확인)"""
+        instance = await self.repo.get_agent_instance(instance_id)
+        if not instance:
+            raise NotFoundException("Agent Instance", instance_id)
+        if instance["owner_id"] != user_id:
+            raise PermissionDeniedException(denied_message)
+        return instance
+
     async def list_agent_instances(
         self,
         user_id: str,
@@ -201,33 +306,36 @@ class AgentService:
         **kwargs,
     ) -> dict[str, Any]:
         """Agent Instance 수정"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
         # 소유자만 수정 가능
-        if instance["owner_id"] != user_id:
-            raise PermissionDeniedException("Agent Instance를 수정할 권한이 없습니다")
+        await self._get_owned_agent_instance(
+            instance_id, user_id, "Agent Instance를 수정할 권한이 없습니다",
+        )
         
-        return await self.repo.update_agent_instance(instance_id, **kwargs)
+        updated = await self.repo.update_agent_instance(instance_id, **kwargs)
+        invalidate_api_key_cache(instance_id)
+        return updated
 
     async def regenerate_api_key(self, instance_id: str, user_id: str) -> str:
         """API Key 재발급"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
         # 소유자만 재발급 가능
-        if instance["owner_id"] != user_id:
-            raise PermissionDeniedException("API Key를 재발급할 권한이 없습니다")
+        await self._get_owned_agent_instance(
+            instance_id, user_id, "API Key를 재발급할 권한이 없습니다",
+        )
         
-        return await self.repo.regenerate_api_key(instance_id) 
+        api_key = await self.repo.regenerate_api_key(instance_id)
+        invalidate_api_key_cache(instance_id)
+        return api_key
 
     async def delete_agent_instance(self, instance_id: str, user_id: str) -> bool:
         """Agent Instance 삭제"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
         # 소유자만 삭제 가능
-        if instance["owner_id"] != user_id:
-            raise PermissionDeniedException("Agent Instance를 삭제할 권한이 없습니다")
+        await self._get_owned_agent_instance(
+            instance_id, user_id, "Agent Instance를 삭제할 권한이 없습니다",
+        )
         
-        return await self.repo.delete_agent_instance(instance_id)
+        deleted = await self.repo.delete_agent_instance(instance_id)
+        invalidate_api_key_cache(instance_id)
+        return deleted
 
     # ==================== Agent Data ====================
 
@@ -236,7 +344,12 @@ class AgentService:
         api_key: str,
         external_user_id: str | None = None,
     ) -> tuple[dict[str, Any], str]:
-        """API Key → (agent_instance, internal_user_id) 해석"""
+        """API Key → (agent_instance, internal_user_id) 해석 (TTL 캐시)"""
+        cache_key = (hash_api_key(api_key), external_user_id)
+        cached = _api_key_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
         instance = await self.repo.get_agent_instance_by_api_key(api_key)
         if not instance:
             raise PermissionDeniedException("유효하지 않은 API Key입니다")
@@ -244,6 +357,9 @@ class AgentService:
         if instance["status"] != "active":
             raise PermissionDeniedException("비활성화된 Agent Instance입니다")
 
+        # 캐시/반환 값에 평문 키가 남지 않도록 제거
+        instance = {k: v for k, v in instance.items() if k != "api_key"}
+
         if external_user_id:
             mapping = await self.repo.get_external_user_mapping_by_external_id(
                 instance["id"],
@@ -253,6 +369,17 @@ class AgentService:
         else:
             internal_user_id = instance["owner_id"]
 
+        now = time.monotonic()
+        if len(_api_key_cache) >= API_KEY_CACHE_SIZE:
+            # 만료 항목부터 정리, 그래도 가득 차 있으면 전체 비움
+            for key in [k for k, (expires_at, _) in _api_key_cache.items() if expires_at <= now]:
+                del _api_key_cache[key]
+            if len(_api_key_cache) >= API_KEY_CACHE_SIZE:
+                _api_key_cache.clear()
+        _api_key_cache[cache_key] = (
+            now + API_KEY_CACHE_TTL_SEC,
+            (instance, internal_user_id),
+        )
         return instance, internal_user_id
 
     async def receive_agent_data(
@@ -268,8 +395,7 @@ class AgentService:
             api_key, external_user_id,
         )
 
-        # 데이터 저장
-        agent_data = await self.repo.create_agent_data(
+        data_kwargs = dict(
             agent_instance_id=instance["id"],
             data_type=data_type,
             content=content,
@@ -277,39 +403,125 @@ class AgentService:
             external_user_id=external_user_id,
             metadata=metadata,
         )
-        
-        # 메모리 타입이면 메모리로 변환
-        if data_type == "memory":
-            await self._convert_to_memory(
-                content=content,
-                owner_id=internal_user_id,
-                agent_instance_id=instance["id"],
-                metadata=metadata,
-            )
 
-        # Webhook 발행
-        event_type = "memory.created" if data_type == "memory" else "message.received"
-        if data_type in ("memory", "message"):
+        # 임베딩은 쓰기 전에 수행 — 네트워크 대기 동안 쓰기 트랜잭션을 잡고 있지 않도록
+        # 임베딩이 실패해도 수신 데이터는 저장한 뒤 예외를 전파
+        vector = None
+        if data_type == "memory":
             try:
-                from src.agent.webhook import WebhookService
-                webhook_svc = WebhookService(self.db)
-                await webhook_svc.fire_event(
+                vector = await _embed_cached(content, self.db, self.embedder)
+            except Exception:
+                await self.repo.create_agent_data(**data_kwargs)
+                raise
+
+        # 데이터 저장 + 메모리 변환을 한 번의 커밋으로 처리
+        # (메모리 변환이 실패해도 finally의 커밋으로 수신 데이터는 저장)
+        try:
+            agent_data = await self.repo.create_agent_data(**data_kwargs, commit=False)
+
+            # 메모리 타입이면 메모리로 변환
+            if data_type == "memory":
+                await self._convert_to_memory(
+                    content=content,
+                    owner_id=internal_user_id,
                     agent_instance_id=instance["id"],
-                    event_type=event_type,
-                    payload={
-                        "event_type": event_type,
-                        "agent_instance_id": instance["id"],
-                        "data_id": agent_data["id"],
-                        "data_type": data_type,
-                        "content": content[:200],
-                    },
-                    webhook_url=instance.get("webhook_url"),
+                    metadata=metadata,
+                    vector=vector,
+                    commit=False,
                 )
-            except Exception:
-                pass
+        finally:
+            await self.db.commit()
+
+        await self._fire_data_events(instance, [agent_data])
 
         return agent_data
 
+    async def receive_agent_data_bulk(
+        self,
+        api_key: str,
+        items: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Agent 데이터 일괄 수신 — 임베딩 1회(embed_batch), 커밋 1회(+Webhook 이벤트 1회), 벡터 저장 1회
+
+        items: data_type, content, external_user_id, metadata 키를 가진 dict 목록
+        """
+        if not items:
+            return []
+
+        # 외부 사용자별 내부 사용자 해석 (TTL 캐시 사용)
+        resolved: dict[str | None, tuple[dict[str, Any], str]] = {}
+        for item in items:
+            external_user_id = item.get("external_user_id")
+            if external_user_id not in resolved:
+                resolved[external_user_id] = await self._resolve_user_from_api_key(
+                    api_key, external_user_id,
+                )
+        instance = next(iter(resolved.values()))[0]
+
+        rows = [
+            {
+                **item,
+                "agent_instance_id": instance["id"],
+                "internal_user_id": resolved[item.get("external_user_id")][1],
+            }
+            for item in items
+        ]
+        memory_rows = [row for row in rows if row["data_type"] == "memory"]
+
+        # 임베딩은 쓰기 전에 한 번에 수행 (실패해도 수신 데이터는 저장한 뒤 예외를 전파)
+        vectors = []
+        if memory_rows:
+            try:
+                vectors = await _embed_many_cached(
+                    [row["content"] for row in memory_rows], self.db, self.embedder,
+                )
+            except Exception:
+                await self.repo.create_agent_data_many(rows)
+                raise
+
+        try:
+            agent_data_list = await self.repo.create_agent_data_many(rows, commit=False)
+            if memory_rows:
+                await self._convert_many_to_memory(memory_rows, vectors, instance["id"])
+        finally:
+            await self.db.commit()
+
+        await self._fire_data_events(instance, agent_data_list)
+
+        return agent_data_list
+
+    async def _fire_data_events(
+        self,
+        instance: dict[str, Any],
+        agent_data_list: list[dict[str, Any]],
+    ) -> None:
+        """memory/message 데이터 수신 Webhook 일괄 발행 (이벤트 저장 커밋 1회, 실패는 무시)"""
+        events = []
+        for agent_data in agent_data_list:
+            data_type = agent_data["data_type"]
+            if data_type not in ("memory", "message"):
+                continue
+            event_type = "memory.created" if data_type == "memory" else "message.received"
+            events.append((event_type, {
+                "event_type": event_type,
+                "agent_instance_id": instance["id"],
+                "data_id": agent_data["id"],
+                "data_type": data_type,
+                "content": agent_data["content"][:200],
+            }))
+        if not events:
+            return
+        try:
+            from src.agent.webhook import WebhookService
+            webhook_svc = WebhookService(self.db)
+            await webhook_svc.fire_events(
+                agent_instance_id=instance["id"],
+                events=events,
+                webhook_url=instance.get("webhook_url"),
+            )
+        except Exception:
+            pass
+
     async def list_agent_data(
         self,
         instance_id: str,
@@ -320,10 +532,8 @@ class AgentService:
         offset: int = 0,
     ) -> list[dict[str, Any]]:
         """Agent 데이터 목록 조회"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
-        # 소유자 또는 공유 대상만 접근 가능
-        await self._check_agent_instance_access(instance, user_id)
+        # 소유자 또는 공유 대상만 접근 가능 (get_agent_instance에서 확인)
+        await self.get_agent_instance(instance_id, user_id)
         
         return await self.repo.list_agent_data(
             agent_instance_id=instance_id,
@@ -339,54 +549,121 @@ class AgentService:
         owner_id: str,
         agent_instance_id: str,
         metadata: dict | None = None,
+        vector: list[float] | None = None,
+        commit: bool = True,
     ) -> dict[str, Any]:
-        """Agent 데이터를 메모리로 변환"""
-        print(f"[DEBUG] Agent 메모리 변환 시작: agent_instance_id={agent_instance_id}")
+        """Agent 데이터를 메모리로 변환 (vector를 넘기면 임베딩 생략)"""
+        logger.debug("Agent 메모리 변환 시작: agent_instance_id=%s", agent_instance_id)
         
-        # 벡터 ID 생성
-        import uuid
+        # 벡터/메모리 ID를 미리 생성 → 벡터 저장과 DB 저장을 동시에 진행
         vector_id = str(uuid.uuid4())
-        print(f"[DEBUG] vector_id 생성: {vector_id}")
+        memory_id = str(uuid.uuid4())
+        logger.debug("vector_id 생성: %s", vector_id)
         
         # 벡터 생성
-        embedding_provider = get_embedding_provider()
-        vector = await embedding_provider.embed(content)
-        print(f"[DEBUG] 벡터 생성 완료: dimension={len(vector)}")
-        
-        # 메모리 생성 (scope를 'agent'로 설정, vector_id 포함)
-        memory = await self.memory_repo.create_memory(
-            content=content,
-            owner_id=owner_id,
-            scope="agent",
-            vector_id=vector_id,
-            category=metadata.get("category") if metadata else None,
-            importance=metadata.get("importance", "medium") if metadata else "medium",
-            metadata={
-                **(metadata or {}),
-                "source": "agent",
-                "agent_instance_id": agent_instance_id,
-            },
-        )
-        print(f"[DEBUG] 메모리 생성 완료: memory_id={memory['id']}, vector_id={memory.get('vector_id')}")
+        if vector is None:
+            vector = await _embed_cached(content, self.db, self.embedder)
+        logger.debug("벡터 생성 완료: dimension=%d", len(vector))
         
-        # 벡터 저장
-        if memory.get("vector_id"):
-            await upsert_vector(
-                vector_id=memory["vector_id"],
+        # 메모리 생성 (scope를 'agent'로 설정, vector_id 포함) + 벡터 저장
+        memory, upsert_result = await asyncio.gather(
+            self.memory_repo.create_memory(
+                content=content,
+                owner_id=owner_id,
+                scope="agent",
+                vector_id=vector_id,
+                category=metadata.get("category") if metadata else None,
+                importance=metadata.get("importance", "medium") if metadata else "medium",
+                metadata={
+                    **(metadata or {}),
+                    "source": "agent",
+                    "agent_instance_id": agent_instance_id,
+                },
+                memory_id=memory_id,
+                commit=commit,
+            ),
+            upsert_vector(
+                vector_id=vector_id,
                 vector=vector,
                 payload={
-                    "memory_id": memory["id"],
+                    "memory_id": memory_id,
                     "scope": "agent",
                     "owner_id": owner_id,
                     "agent_instance_id": agent_instance_id,
                 },
-            )
-            print(f"[DEBUG] 벡터 저장 완료: vector_id={memory['vector_id']}, agent_instance_id={agent_instance_id}")
-        else:
-            print(f"[WARNING] vector_id가 없어서 벡터 저장 건너뜀")
+            ),
+            return_exceptions=True,
+        )
+
+        if isinstance(memory, BaseException):
+            # DB 저장 실패 → 이미 저장된 벡터 정리 (검색에 고아 벡터가 노출되지 않도록)
+            if not isinstance(upsert_result, BaseException):
+                try:
+                    await delete_vector(vector_id)
+                except Exception as e:
+                    logger.warning("고아 벡터 삭제 실패: vector_id=%s, error=%s", vector_id, e)
+            raise memory
+        if isinstance(upsert_result, BaseException):
+            raise upsert_result
+
+        logger.debug("메모리/벡터 저장 완료: memory_id=%s, vector_id=%s", memory["id"], vector_id)
         
         return memory
 
+    async def _convert_many_to_memory(
+        self,
+        rows: list[dict[str, Any]],
+        vectors: list[list[float]],
+        agent_instance_id: str,
+    ) -> None:
+        """Agent 데이터 여러 건을 메모리로 변환 (커밋은 호출자가 수행)"""
+        memory_rows = []
+        points = []
+        for row, vector in zip(rows, vectors):
+            metadata = row.get("metadata")
+            memory_id = str(uuid.uuid4())
+            vector_id = str(uuid.uuid4())
+            memory_rows.append({
+                "id": memory_id,
+                "content": row["content"],
+                "owner_id": row["internal_user_id"],
+                "scope": "agent",
+                "vector_id": vector_id,
+                "category": metadata.get("category") if metadata else None,
+                "importance": metadata.get("importance", "medium") if metadata else "medium",
+                "metadata": {
+                    **(metadata or {}),
+                    "source": "agent",
+                    "agent_instance_id": agent_instance_id,
+                },
+            })
+            points.append((vector_id, vector, {
+                "memory_id": memory_id,
+                "scope": "agent",
+                "owner_id": row["internal_user_id"],
+                "agent_instance_id": agent_instance_id,
+            }))
+
+        db_result, upsert_result = await asyncio.gather(
+            self.memory_repo.create_memories_many(memory_rows, commit=False),
+            upsert_vectors(points),
+            return_exceptions=True,
+        )
+
+        if isinstance(db_result, BaseException):
+            # DB 저장 실패 → 이미 저장된 벡터 정리
+            if not isinstance(upsert_result, BaseException):
+                for vector_id, _, _ in points:
+                    try:
+                        await delete_vector(vector_id)
+                    except Exception as e:
+                        logger.warning("고아 벡터 삭제 실패: vector_id=%s, error=%s", vector_id, e)
+            raise db_result
+        if isinstance(upsert_result, BaseException):
+            raise upsert_result
+
+        logger.debug("메모리/벡터 일괄 저장 완료: %d건", len(memory_rows))
+
     # ==================== Agent Memory Access (API Key Auth) ====================
 
     async def get_memory_sources(
@@ -399,11 +676,8 @@ class AgentService:
             api_key, external_user_id,
         )
 
-        chat_repo = ChatRepository(self.db)
-        user_repo = UserRepository(self.db)
-
         # 1. 채팅방
-        rooms = await chat_repo.get_user_rooms(user_id)
+        rooms = await self.chat_repo.get_user_rooms(user_id)
         chat_room_sources = [
             {"id": r["id"], "name": r["name"], "room_type": r.get("room_type")}
             for r in rooms
@@ -442,57 +716,45 @@ class AgentService:
             api_key, external_user_id,
         )
 
-        # 접근 가능한 소스 ID 집합 조회 (권한 검증용)
-        accessible = await self.get_memory_sources(api_key, external_user_id)
-        accessible_room_ids = {r["id"] for r in accessible["chat_rooms"]}
+        # 접근 가능한 대화방 ID 집합 조회 (권한 검증용, API Key는 위에서 이미 해석)
+        rooms = await self.chat_repo.get_user_rooms(user_id)
+        accessible_room_ids = {r["id"] for r in rooms}
 
         if context_sources is None:
             context_sources = {}
 
         # 쿼리 임베딩
-        embedding_provider = get_embedding_provider()
-        query_vector = await embedding_provider.embed(query)
+        query_vector = await _embed_cached(query, provider=self.embedder)
 
         all_memories: list[dict[str, Any]] = []
 
-        # 1. 채팅방 메모리
-        for room_id in context_sources.get("chat_rooms", []):
-            if room_id not in accessible_room_ids:
-                continue
-            results = await search_vectors(
-                query_vector=query_vector,
-                limit=5,
-                filter_conditions={"chat_room_id": room_id},
-            )
-            for r in results:
-                memory = await self.memory_repo.get_memory(
-                    r["payload"].get("memory_id")
-                )
-                if memory and not memory.get("superseded", False):
-                    all_memories.append({"memory": memory, "score": r["score"]})
+        # 소스별 조건을 OR(should)로 묶어 한 번의 벡터 검색으로 처리
+        source_filters: list[dict[str, Any]] = []
+
+        # 1. 채팅방 메모리 (같은 대화방의 문서 청크는 제외)
+        room_ids = [
+            room_id for room_id in context_sources.get("chat_rooms", [])
+            if room_id in accessible_room_ids
+        ]
+        if room_ids:
+            source_filters.append({
+                "must": [{"key": "chat_room_id", "match": {"any": room_ids}}],
+                "must_not": [{"key": "scope", "match": {"value": "document"}}],
+            })
 
         # 2. Agent 메모리
         if context_sources.get("include_agent", False):
-            print(f"[DEBUG] Agent 메모리 검색: query='{query}', agent_instance_id={instance['id']}")
-            results = await search_vectors(
-                query_vector=query_vector,
-                limit=5,
-                filter_conditions={
-                    "owner_id": user_id,
-                    "scope": "agent",
-                    "agent_instance_id": instance["id"]
-                },
-            )
-            print(f"[DEBUG] Agent 메모리 검색 결과: {len(results)}개")
-            for r in results:
-                memory = await self.memory_repo.get_memory(
-                    r["payload"].get("memory_id")
-                )
-                if memory and not memory.get("superseded", False):
-                    all_memories.append({"memory": memory, "score": r["score"]})
-                    print(f"[DEBUG]   - memory_id={memory['id']}, score={r['score']:.3f}, content={memory['content'][:50]}...")
+            logger.debug("Agent 메모리 검색: query=%r, agent_instance_id=%s", query, instance["id"])
+            source_filters.append({
+                "must": [
+                    {"key": "owner_id", "match": {"value": user_id}},
+                    {"key": "scope", "match": {"value": "agent"}},
+                    {"key": "agent_instance_id", "match": {"value": instance["id"]}},
+                ],
+            })
 
         # 2-1. 교차 에이전트 메모리 (Phase 3-1)
+        other_instance_ids = []
         for other_instance_id in context_sources.get("agent_instances", []):
             # 접근 권한 확인: 공유된 에이전트만 허용
             other_instance = await self.repo.get_agent_instance(other_instance_id)
@@ -503,77 +765,106 @@ class AgentService:
                 await self._check_agent_instance_access(other_instance, user_id)
             except Exception:
                 continue
+            other_instance_ids.append(other_instance_id)
+        if other_instance_ids:
+            source_filters.append({
+                "must": [
+                    {"key": "scope", "match": {"value": "agent"}},
+                    {"key": "agent_instance_id", "match": {"any": other_instance_ids}},
+                ],
+            })
 
-            results = await search_vectors(
-                query_vector=query_vector,
-                limit=5,
-                filter_conditions={
-                    "scope": "agent",
-                    "agent_instance_id": other_instance_id,
-                },
-            )
-            for r in results:
-                memory = await self.memory_repo.get_memory(
-                    r["payload"].get("memory_id")
+        # 3. 문서 메모리
+        if context_sources.get("include_document", False):
+            logger.debug("문서 메모리 검색: query=%r, owner_id=%s", query, user_id)
+            source_filters.append({
+                "must": [
+                    {"key": "owner_id", "match": {"value": user_id}},
+                    {"key": "scope", "match": {"value": "document"}},
+                ],
+            })
+
+        results = []
+        if source_filters:
+            try:
+                results = await search_vectors(
+                    query_vector=query_vector,
+                    limit=max(SEARCH_MIN_CANDIDATES, limit * SEARCH_OVERFETCH_FACTOR),
+                    filter_conditions={"should": source_filters},
                 )
-                if memory and not memory.get("superseded", False):
-                    all_memories.append({"memory": memory, "score": r["score"]})
+            except Exception as e:
+                logger.warning("벡터 검색 실패: %s", e)
+
+        # scope 기준으로 메모리/문서 청크 분리
+        memory_hits: list[dict[str, Any]] = []
+        document_hits: list[dict[str, Any]] = []
+        for r in results:
+            if r["payload"].get("scope") == "document":
+                document_hits.append(r)
+            else:
+                memory_hits.append(r)
+
+        # 배치 메모리 조회 (N+1 해소)
+        memory_ids = [r["payload"].get("memory_id") for r in memory_hits if r["payload"].get("memory_id")]
+        memories_list = await self.memory_repo.get_memories_by_ids(memory_ids) if memory_ids else []
+        memories_by_id = {m["id"]: m for m in memories_list}
+        for r in memory_hits:
+            memory = memories_by_id.get(r["payload"].get("memory_id"))
+            if memory and not memory.get("superseded", False):
+                all_memories.append({"memory": memory, "score": r["score"]})
 
-        # 3. 문서 메모리
         if context_sources.get("include_document", False):
-            print(f"[DEBUG] 문서 메모리 검색: query='{query}', owner_id={user_id}")
-            results = await search_vectors(
-                query_vector=query_vector,
-                limit=5,
-                filter_conditions={"owner_id": user_id, "scope": "document"},
-            )
-            print(f"[DEBUG] 문서 메모리 검색 결과: {len(results)}개")
-            for r in results:
-                # 문서 청크는 메모리 테이블이 아니라 별도로 처리
+            logger.debug("문서 메모리 검색 결과: %d개", len(document_hits))
+        # 리랭킹 기준 시각 — 검색당 한 번만 계산 (문서 청크 created_at에도 재사용)
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+
+        # 문서 청크는 메모리 테이블이 아니라 별도로 처리 — 한 번에 배치 조회
+        if document_hits:
+            chunks_by_key = await self.document_repo.get_chunks_by_keys([
+                (r["payload"].get("document_id"), r["payload"].get("chunk_index"))
+                for r in document_hits
+            ])
+
+            for r in document_hits:
                 document_id = r["payload"].get("document_id")
                 chunk_index = r["payload"].get("chunk_index")
-                
-                # 문서 청크 내용 조회
-                from src.document.repository import DocumentRepository
-                doc_repo = DocumentRepository(self.db)
-                chunks = await doc_repo.get_chunks(document_id)
-                chunk_content = ""
-                for c in chunks:
-                    if c["chunk_index"] == chunk_index:
-                        chunk_content = c["content"]
-                        break
-                
-                if chunk_content:
-                    # 문서 청크를 메모리 형식으로 변환
-                    from datetime import datetime, timezone
-                    doc_memory = {
-                        "id": f"doc_{document_id}_{chunk_index}",
-                        "content": chunk_content,
-                        "scope": "document",
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                        "metadata": {
-                            "document_id": document_id,
-                            "chunk_index": chunk_index,
-                        }
+                chunk = chunks_by_key.get((document_id, chunk_index))
+                if not chunk or not chunk["content"]:
+                    continue
+
+                # 문서 청크를 메모리 형식으로 변환
+                doc_memory = {
+                    "id": f"doc_{document_id}_{chunk_index}",
+                    "content": chunk["content"],
+                    "scope": "document",
+                    "created_at": now_iso,
+                    "metadata": {
+                        "document_id": document_id,
+                        "chunk_index": chunk_index,
                     }
-                    all_memories.append({"memory": doc_memory, "score": r["score"]})
-                    print(f"[DEBUG]   - document_id={document_id}, chunk_index={chunk_index}, score={r['score']:.3f}")
+                }
+                all_memories.append({"memory": doc_memory, "score": r["score"]})
+                logger.debug(
+                    "  - document_id=%s, chunk_index=%s, score=%.3f",
+                    document_id, chunk_index, r["score"],
+                )
 
         # 리랭킹: 유사도(60%) + 최신도(40%)
         for m in all_memories:
             similarity_score = m["score"]
-            recency_score = self._calculate_recency_score(m["memory"]["created_at"])
+            recency_score = self._calculate_recency_score(m["memory"]["created_at"], now)
             m["score"] = (similarity_score * SIMILARITY_ALPHA) + (recency_score * RECENCY_BETA)
 
-        # 중복 제거 + 정렬
-        seen: set[str] = set()
-        unique: list[dict[str, Any]] = []
-        for m in sorted(all_memories, key=lambda x: x["score"], reverse=True):
-            if m["memory"]["id"] not in seen:
-                seen.add(m["memory"]["id"])
-                unique.append(m)
+        # 중복 제거 (같은 메모리는 최고 점수만 유지) + 상위 limit개 선택
+        best_by_id: dict[str, dict[str, Any]] = {}
+        for m in all_memories:
+            memory_id = m["memory"]["id"]
+            best = best_by_id.get(memory_id)
+            if best is None or m["score"] > best["score"]:
+                best_by_id[memory_id] = m
 
-        results_list = unique[:limit]
+        results_list = heapq.nlargest(limit, best_by_id.values(), key=lambda x: x["score"])
 
         return {
             "results": [
@@ -622,17 +913,18 @@ class AgentService:
 
         return {"data": data_list, "total": total}
 
-    def _calculate_recency_score(self, created_at: str) -> float:
-        """최신성 점수 계산"""
+    def _calculate_recency_score(self, created_at: str, now: datetime | None = None) -> float:
+        """최신성 점수 계산 (now를 넘기면 배치 리랭킹에서 기준 시각을 공유)"""
         try:
             created_dt = datetime.fromisoformat(created_at)
             if created_dt.tzinfo is None:
                 created_dt = created_dt.replace(tzinfo=timezone.utc)
-            now = datetime.now(timezone.utc)
+            if now is None:
+                now = datetime.now(timezone.utc)
             days_old = (now - created_dt).days
             if days_old >= RECENCY_DECAY_DAYS:
                 return 0.0
-            return max(0.0, 1.0 - (days_old / RECENCY_DECAY_DAYS))
+            return max(0.0, 1.0 - days_old * _RECENCY_DECAY_INV)
         except Exception:
             return 0.5
 
@@ -647,18 +939,19 @@ class AgentService:
         external_system_name: str | None = None,
     ) -> dict[str, Any]:
         """외부 사용자 매핑 생성"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
         # 소유자만 매핑 생성 가능
-        if instance["owner_id"] != user_id:
-            raise PermissionDeniedException("사용자 매핑을 생성할 권한이 없습니다")
+        await self._get_owned_agent_instance(
+            instance_id, user_id, "사용자 매핑을 생성할 권한이 없습니다",
+        )
         
-        return await self.repo.create_external_user_mapping(
+        mapping = await self.repo.create_external_user_mapping(
             agent_instance_id=instance_id,
             external_user_id=external_user_id,
             internal_user_id=internal_user_id,
             external_system_name=external_system_name,
         )
+        invalidate_api_key_cache(instance_id)
+        return mapping
 
     async def list_external_user_mappings(
         self,
@@ -668,11 +961,10 @@ class AgentService:
         offset: int = 0,
     ) -> list[dict[str, Any]]:
         """외부 사용자 매핑 목록 조회"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
         # 소유자만 조회 가능
-        if instance["owner_id"] != user_id:
-            raise PermissionDeniedException("사용자 매핑을 조회할 권한이 없습니다")
+        await self._get_owned_agent_instance(
+            instance_id, user_id, "사용자 매핑을 조회할 권한이 없습니다",
+        )
         
         return await self.repo.list_external_user_mappings(
             agent_instance_id=instance_id,
@@ -696,7 +988,9 @@ class AgentService:
         if instance and instance["owner_id"] != user_id:
             raise PermissionDeniedException("사용자 매핑을 삭제할 권한이 없습니다")
         
-        return await self.repo.delete_external_user_mapping(mapping_id)
+        deleted = await self.repo.delete_external_user_mapping(mapping_id)
+        invalidate_api_key_cache(mapping["agent_instance_id"])
+        return deleted
 
     # ==================== Agent Instance Share ====================
 
@@ -710,11 +1004,10 @@ class AgentService:
         role: str = "viewer",
     ) -> dict[str, Any]:
         """Agent Instance 공유 생성"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
         # 소유자만 공유 가능
-        if instance["owner_id"] != user_id:
-            raise PermissionDeniedException("Agent Instance를 공유할 권한이 없습니다")
+        await self._get_owned_agent_instance(
+            instance_id, user_id, "Agent Instance를 공유할 권한이 없습니다",
+        )
         
         return await self.repo.create_agent_instance_share(
             agent_instance_id=instance_id,
@@ -732,11 +1025,10 @@ class AgentService:
         offset: int = 0,
     ) -> list[dict[str, Any]]:
         """Agent Instance 공유 목록 조회"""
-        instance = await self.get_agent_instance(instance_id, user_id)
-        
         # 소유자만 조회 가능
-        if instance["owner_id"] != user_id:
-            raise PermissionDeniedException("공유 목록을 조회할 권한이 없습니다")
+        await self._get_owned_agent_instance(
+            instance_id, user_id, "공유 목록을 조회할 권한이 없습니다",
+        )
         
         return await self.repo.list_agent_instance_shares(
             agent_instance_id=instance_id,
@@ -776,6 +1068,8 @@ class AgentService:
         shares = await self.repo.list_agent_instance_shares(
             agent_instance_id=instance["id"],
         )
+        user_department_id = None
+        department_loaded = False
         for share in shares:
             if share.get("shared_with_user_id") == user_id:
                 return True
@@ -787,56 +1081,27 @@ class AgentService:
 
             # 부서 공유 확인
             if share.get("shared_with_department_id"):
-                cursor = await self.db.execute(
-                    "SELECT department_id FROM users WHERE id = ?",
-                    (user_id,),
-                )
-                row = await cursor.fetchone()
-                if row and row["department_id"] == share["shared_with_department_id"]:
+                # 사용자 부서는 공유 건수와 무관하게 한 번만 조회
+                if not department_loaded:
+                    cursor = await self.db.execute(
+                        "SELECT department_id FROM users WHERE id = ?",
+                        (user_id,),
+                    )
+                    row = await cursor.fetchone()
+                    user_department_id = row["department_id"] if row else None
+                    department_loaded = True
+                if user_department_id and user_department_id == share["shared_with_department_id"]:
                     return True
 
         raise PermissionDeniedException("Agent Instance에 접근할 권한이 없습니다")
 
-    async def _check_same_department(self, user_id: str, developer_id: str) -> bool:
-        """같은 부서인지 확인"""
-        cursor = await self.db.execute(
-            """
-            SELECT u1.department_id, u2.department_id
-            FROM users u1, users u2
-            WHERE u1.id = ? AND u2.id = ?
-            """,
-            (user_id, developer_id),
-        )
-        row = await cursor.fetchone()
-        if row and row["u1.department_id"] and row["u2.department_id"]:
-            return row["u1.department_id"] == row["u2.department_id"]
-        return False
-
-    async def _check_shared_project(self, user_id: str, developer_id: str) -> bool:
-        """같은 프로젝트에 속해 있는지 확인"""
-        cursor = await self.db.execute(
-            """
-            SELECT COUNT(*) as count
-            FROM project_members pm1, project_members pm2
-            WHERE pm1.user_id = ? AND pm2.user_id = ? AND pm1.project_id = pm2.project_id
-            """,
-            (user_id, developer_id),
-        )
-        row = await cursor.fetchone()
-        return row["count"] > 0
-
     async def _check_project_member(self, user_id: str, project_id: str) -> bool:
         """프로젝트 멤버인지 확인"""
         cursor = await self.db.execute(
-            """
-            SELECT COUNT(*) as count
-            FROM project_members
-            WHERE user_id = ? AND project_id = ?
-            """,
+            "SELECT 1 FROM project_members WHERE user_id = ? AND project_id = ? LIMIT 1",
             (user_id, project_id),
         )
-        row = await cursor.fetchone()
-        return row["count"] > 0
+        return await cursor.fetchone() is not None
 
     # ==================== Phase 2-1: 사용량 통계 ====================
 
@@ -1,19 +1,139 @@
-"""Webhook Service - 에이전트 이벤트 발행 및 재시도"""
+"""Webhook Service - 에이전트 이벤트 발행 및 재시도
+
+재시도 상태는 webhook_events.next_attempt_at에 저장한다 (outbox).
+최초 전송은 워커 큐가 바로 처리하고, 실패한 이벤트는 디스패처가
+주기적으로 재시도 시각이 된 이벤트를 모아 재전송한다.
+"""
 
 import asyncio
-import json
 import logging
+import random
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import httpx
 import aiosqlite
 
 from src.agent.repository import AgentRepository
+from src.shared import json_utils
 
 logger = logging.getLogger(__name__)
 
 MAX_ATTEMPTS = 3
 BACKOFF_BASE = 2  # 지수 백오프 기본값 (초)
+REQUEST_TIMEOUT_SEC = 10.0
+# 워커 큐에 넣은 이벤트를 디스패처가 중복 전송하지 않도록 잡아두는 시간 (초)
+DELIVERY_LEASE_SEC = 60
+DISPATCH_INTERVAL_SEC = 1.0
+DISPATCH_BATCH_SIZE = 100
+
+# 전송마다 TCP/TLS 연결을 새로 맺지 않도록 keep-alive 풀을 공유하는 클라이언트
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_webhook_client() -> httpx.AsyncClient:
+    """Webhook 전송용 공유 HTTP 클라이언트 (최초 호출 시 생성)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT_SEC,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+        )
+    return _http_client
+
+
+# 전송 작업 큐 — 고정 개수 워커가 소비하여 동시 전송/재시도 태스크 수를 제한
+WEBHOOK_WORKER_COUNT = 16
+WEBHOOK_QUEUE_SIZE = 1000
+
+_delivery_queue: asyncio.Queue | None = None
+_workers: list[asyncio.Task] = []
+
+
+def _utc_iso(offset_sec: float = 0) -> str:
+    """현재 UTC 시각(+offset) ISO 문자열 — next_attempt_at 저장/비교용"""
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_sec)).isoformat()
+
+
+async def _worker() -> None:
+    """큐에서 전송 작업을 꺼내 처리"""
+    assert _delivery_queue is not None
+    while True:
+        service, event_id, webhook_url, payload = await _delivery_queue.get()
+        try:
+            await service._deliver(event_id, webhook_url, payload)
+        except Exception as e:
+            logger.error(f"Webhook worker error: event={event_id}, error={e}")
+        finally:
+            _delivery_queue.task_done()
+
+
+def start_webhook_workers(n: int = WEBHOOK_WORKER_COUNT) -> None:
+    """전송 워커 시작 (이미 실행 중이면 무시)"""
+    global _delivery_queue
+    if _workers:
+        return
+    _delivery_queue = asyncio.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+    for _ in range(n):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop_webhook_workers() -> None:
+    """전송 워커 종료 (미전송 이벤트는 lease 만료 후 디스패처가 재전송)"""
+    global _delivery_queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _delivery_queue = None
+
+
+_dispatcher_task: asyncio.Task | None = None
+_dispatcher_db: aiosqlite.Connection | None = None
+
+
+async def _dispatch_loop(service: "WebhookService") -> None:
+    """재시도 시각이 된 이벤트를 주기적으로 재전송"""
+    while True:
+        try:
+            await service.dispatch_due_events()
+        except Exception as e:
+            logger.error(f"Webhook dispatcher error: {e}")
+        await asyncio.sleep(DISPATCH_INTERVAL_SEC)
+
+
+async def start_webhook_dispatcher() -> None:
+    """재시도 디스패처 시작 (전용 DB 연결 사용)"""
+    global _dispatcher_task, _dispatcher_db
+    if _dispatcher_task:
+        return
+    from src.shared.database import get_db_sync
+
+    _dispatcher_db = await get_db_sync()
+    _dispatcher_task = asyncio.create_task(_dispatch_loop(WebhookService(_dispatcher_db)))
+
+
+async def stop_webhook_dispatcher() -> None:
+    """재시도 디스패처 종료"""
+    global _dispatcher_task, _dispatcher_db
+    if _dispatcher_task:
+        _dispatcher_task.cancel()
+        try:
+            await _dispatcher_task
+        except asyncio.CancelledError:
+            pass
+        _dispatcher_task = None
+    if _dispatcher_db:
+        await _dispatcher_db.close()
+        _dispatcher_db = None
+
+
+async def close_webhook_client() -> None:
+    """공유 HTTP 클라이언트 종료"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 class WebhookService:
@@ -31,75 +151,107 @@ class WebhookService:
         webhook_url: str | None = None,
     ) -> dict | None:
         """이벤트 생성 후 webhook 전송 시도"""
-        # 이벤트 저장
-        event = await self.repo.create_webhook_event(
-            agent_instance_id=agent_instance_id,
-            event_type=event_type,
-            payload=json.dumps(payload),
-        )
-
         if not webhook_url:
             # webhook_url이 없으면 인스턴스에서 가져오기
             instance = await self.repo.get_agent_instance(agent_instance_id)
             webhook_url = instance.get("webhook_url") if instance else None
 
+        # 이벤트 저장 (전송 대상이면 lease 동안 디스패처가 건드리지 않도록 예약)
+        event = await self.repo.create_webhook_event(
+            agent_instance_id=agent_instance_id,
+            event_type=event_type,
+            payload=json_utils.dumps(payload),
+            next_attempt_at=_utc_iso(DELIVERY_LEASE_SEC) if webhook_url else None,
+        )
+
         if not webhook_url:
             return event
 
-        # 비동기로 전송 시도 (백그라운드)
-        asyncio.create_task(self._deliver(event["id"], webhook_url, payload))
+        # 워커 큐에 전송 작업 등록 (큐가 가득 차면 대기 — backpressure)
+        start_webhook_workers()
+        await _delivery_queue.put((self, event["id"], webhook_url, payload))
 
         return event
 
+    async def fire_events(
+        self,
+        agent_instance_id: str,
+        events: list[tuple[str, dict[str, Any]]],
+        webhook_url: str | None,
+    ) -> list[str]:
+        """이벤트 여러 건을 한 번에 저장(커밋 1회) 후 전송 큐에 등록, 이벤트 ID 반환
+
+        webhook_url은 호출자가 이미 아는 값을 그대로 쓴다 (None이면 저장만, 인스턴스 재조회 없음).
+        """
+        if not events:
+            return []
+        event_ids = await self.repo.create_webhook_events(
+            agent_instance_id=agent_instance_id,
+            events=[(event_type, json_utils.dumps(payload)) for event_type, payload in events],
+            next_attempt_at=_utc_iso(DELIVERY_LEASE_SEC) if webhook_url else None,
+        )
+
+        if webhook_url:
+            start_webhook_workers()
+            for event_id, (_, payload) in zip(event_ids, events):
+                await _delivery_queue.put((self, event_id, webhook_url, payload))
+
+        return event_ids
+
+    async def dispatch_due_events(self, limit: int = DISPATCH_BATCH_SIZE) -> int:
+        """재시도 시각이 된 이벤트를 한 번에 모아 재전송, 처리 건수 반환"""
+        events = await self.repo.get_due_webhook_events(_utc_iso(), limit=limit)
+        if not events:
+            return 0
+        await asyncio.gather(*(
+            self._deliver(e["id"], e["webhook_url"], e["payload"], attempt=e["attempts"] + 1)
+            for e in events
+        ))
+        return len(events)
+
     async def _deliver(
         self,
         event_id: str,
         webhook_url: str,
         payload: dict[str, Any],
+        attempt: int = 1,
     ) -> None:
-        """Webhook 전송 (재시도 포함)"""
-        for attempt in range(1, MAX_ATTEMPTS + 1):
-            try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.post(
-                        webhook_url,
-                        json=payload,
-                        headers={"Content-Type": "application/json"},
-                    )
-                    status_code = response.status_code
-
-                if 200 <= status_code < 300:
-                    await self.repo.update_webhook_event(
-                        event_id=event_id,
-                        status="delivered",
-                        attempts=attempt,
-                        response_status=status_code,
-                    )
-                    logger.info(f"Webhook delivered: event={event_id}, status={status_code}")
-                    return
-                else:
-                    await self.repo.update_webhook_event(
-                        event_id=event_id,
-                        status="failed",
-                        attempts=attempt,
-                        response_status=status_code,
-                    )
-                    logger.warning(
-                        f"Webhook failed: event={event_id}, attempt={attempt}, status={status_code}"
-                    )
-
-            except Exception as e:
+        """Webhook 1회 전송 — 실패 시 다음 재시도 시각을 기록"""
+        status_code = None
+        try:
+            response = await get_webhook_client().post(
+                webhook_url,
+                content=json_utils.dumps(payload),
+                headers={"Content-Type": "application/json"},
+            )
+            status_code = response.status_code
+
+            if 200 <= status_code < 300:
                 await self.repo.update_webhook_event(
                     event_id=event_id,
-                    status="failed",
+                    status="delivered",
                     attempts=attempt,
+                    response_status=status_code,
                 )
-                logger.warning(f"Webhook error: event={event_id}, attempt={attempt}, error={e}")
+                logger.info(f"Webhook delivered: event={event_id}, status={status_code}")
+                return
+            logger.warning(
+                f"Webhook failed: event={event_id}, attempt={attempt}, status={status_code}"
+            )
+        except Exception as e:
+            logger.warning(f"Webhook error: event={event_id}, attempt={attempt}, error={e}")
 
-            # 지수 백오프
-            if attempt < MAX_ATTEMPTS:
-                delay = BACKOFF_BASE ** attempt
-                await asyncio.sleep(delay)
+        if attempt < MAX_ATTEMPTS:
+            # 지수 백오프 (full jitter — 동시 실패 시 재시도 몰림 방지)
+            next_attempt_at = _utc_iso(random.uniform(0, BACKOFF_BASE ** attempt))
+        else:
+            next_attempt_at = None
+            logger.error(f"Webhook exhausted: event={event_id}, max_attempts={MAX_ATTEMPTS}")
 
-        # 최대 시도 초과
-        logger.error(f"Webhook exhausted: event={event_id}, max_attempts={MAX_ATTEMPTS}")
+        await self.repo.update_webhook_event(
+            event_id=event_id,
+            status="failed",
+            attempts=attempt,
+            response_status=status_code,
+            next_attempt_at=next_attempt_at,
+        )
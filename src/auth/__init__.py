@@ -1,4 +1,4 @@
 from src.auth.router import router
 from src.auth.service import AuthService
-from src.auth.schemas import LoginRequest, LoginResponse, RegisterRequest, UserInfo
+from src.auth.schemas import LoginRequest, LoginResponse, RegisterRequest, UserInfo, SSOLoginRequest
 from src.shared.auth import get_current_user_id
@@ -1,17 +1,25 @@
 """인증 스키마"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
+# 인증 스키마는 생성 후 변경하지 않으므로 불변(frozen)으로 고정
+# (비밀번호 값이 바뀌지 않도록 str_strip_whitespace는 사용하지 않음)
+_AUTH_MODEL_CONFIG = ConfigDict(frozen=True, extra="ignore")
+
 
 class LoginRequest(BaseModel):
     """로그인 요청"""
+    model_config = _AUTH_MODEL_CONFIG
+
     email: str
     password: str
 
 
 class UserInfo(BaseModel):
     """사용자 정보"""
+    model_config = _AUTH_MODEL_CONFIG
+
     id: str
     name: str
     email: str
@@ -21,6 +29,8 @@ class UserInfo(BaseModel):
 
 class LoginResponse(BaseModel):
     """로그인 응답"""
+    model_config = _AUTH_MODEL_CONFIG
+
     access_token: str
     token_type: str = "bearer"
     user: UserInfo
@@ -28,6 +38,8 @@ class LoginResponse(BaseModel):
 
 class RegisterRequest(BaseModel):
     """회원가입 요청"""
+    model_config = _AUTH_MODEL_CONFIG
+
     name: str
     email: str
     password: str
@@ -36,6 +48,8 @@ class RegisterRequest(BaseModel):
 
 class SSOLoginRequest(BaseModel):
     """SSO 로그인 요청"""
+    model_config = _AUTH_MODEL_CONFIG
+
     email: str
     name: str
     sso_provider: str  # "saml", "oidc", "oauth2" 등
@@ -1,12 +1,43 @@
 """인증 서비스"""
 
-from typing import Optional
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
 import aiosqlite
 
 from src.user.repository import UserRepository
 from src.shared.auth import create_access_token, verify_access_token, hash_password, verify_password
 from src.shared.exceptions import NotFoundException, ForbiddenException
 
+# 비밀번호 해싱 전용 스레드 풀
+# PBKDF2는 GIL을 풀고 CPU를 점유하므로 코어 수만큼만 병렬 실행하고,
+# 로그인 폭주 시에도 기본 executor(to_thread 등 다른 작업)를 고갈시키지 않는다.
+_PASSWORD_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash",
+)
+
+
+# 존재하지 않는 사용자 로그인에도 같은 비용의 검증을 수행하기 위한 더미 해시
+# (응답 시간으로 가입 여부가 드러나지 않도록)
+_DUMMY_PASSWORD_HASH = hash_password("!invalid!")
+
+
+# 현재 사용자 정보 TTL 캐시: user_id → (만료 시각, 사용자 정보)
+# /auth/me는 페이지 로드마다 호출되므로 짧은 TTL로 DB 조회를 생략한다.
+# 역할/부서 변경은 최대 TTL만큼 늦게 반영된다.
+USER_CACHE_TTL_SEC = 5.0
+USER_CACHE_SIZE = 4096
+_user_cache: dict[str, tuple[float, dict]] = {}
+
+
+async def _run_password_task(func: Callable[..., Any], *args: Any) -> Any:
+    """비밀번호 해싱/검증을 전용 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_PASSWORD_EXECUTOR, func, *args)
+
 
 class AuthService:
     """인증 관련 비즈니스 로직"""
@@ -20,12 +51,14 @@ class AuthService:
         # 사용자 조회
         user = await self.user_repo.get_user_by_email(email)
         if not user:
+            await _run_password_task(verify_password, password, _DUMMY_PASSWORD_HASH)
             raise ForbiddenException("이메일 또는 비밀번호가 올바르지 않습니다")
         
         # 비밀번호 검증 (password_hash 컬럼이 있는 경우)
+        # PBKDF2는 CPU를 오래 점유하므로 이벤트 루프를 막지 않도록 스레드에서 실행
         stored_password = user.get("password_hash")
         if stored_password:
-            if not verify_password(password, stored_password):
+            if not await _run_password_task(verify_password, password, stored_password):
                 raise ForbiddenException("이메일 또는 비밀번호가 올바르지 않습니다")
         # password_hash가 없으면 개발모드로 통과
         
@@ -57,23 +90,17 @@ class AuthService:
         if existing:
             raise ForbiddenException("이미 사용 중인 이메일입니다")
         
-        # 비밀번호 해싱
-        password_hash = hash_password(password)
+        # 비밀번호 해싱 (스레드에서 실행)
+        password_hash = await _run_password_task(hash_password, password)
         
-        # 사용자 생성
+        # 사용자 생성 (password_hash 포함)
         user = await self.user_repo.create_user(
             name=name,
             email=email,
             department_id=department_id,
+            password_hash=password_hash,
         )
         
-        # password_hash 업데이트
-        await self.db.execute(
-            "UPDATE users SET password_hash = ? WHERE id = ?",
-            (password_hash, user["id"])
-        )
-        await self.db.commit()
-        
         # 토큰 생성
         access_token = create_access_token(user["id"])
         
@@ -94,12 +121,17 @@ class AuthService:
         user_id = verify_access_token(token)
         if not user_id:
             raise ForbiddenException("유효하지 않은 토큰입니다")
+
+        now = time.monotonic()
+        cached = _user_cache.get(user_id)
+        if cached is not None and cached[0] > now:
+            return dict(cached[1])
         
         user = await self.user_repo.get_user(user_id)
         if not user:
             raise NotFoundException("사용자", user_id)
         
-        return {
+        info = {
             "id": user["id"],
             "name": user["name"],
             "email": user["email"],
@@ -107,6 +139,15 @@ class AuthService:
             "role": user.get("role", "user"),
         }
 
+        if len(_user_cache) >= USER_CACHE_SIZE:
+            # 만료 항목 우선 제거, 그래도 가득 차 있으면 전체 비움
+            for key in [k for k, (expires, _) in _user_cache.items() if expires <= now]:
+                del _user_cache[key]
+            if len(_user_cache) >= USER_CACHE_SIZE:
+                _user_cache.clear()
+        _user_cache[user_id] = (now + USER_CACHE_TTL_SEC, info)
+        return dict(info)
+
     def verify_token(self, token: str) -> Optional[str]:
         """토큰 검증"""
         return verify_access_token(token)
@@ -132,22 +173,25 @@ class AuthService:
 
             # role 정보 업데이트
             user["role"] = existing_role
+
+            # SSO 메타데이터 저장 (변경된 경우에만)
+            if (user.get("sso_provider"), user.get("sso_id")) != (sso_provider, sso_id):
+                await self.db.execute(
+                    """UPDATE users SET sso_provider = ?, sso_id = ? WHERE id = ?""",
+                    (sso_provider, sso_id, user["id"]),
+                )
+                await self.db.commit()
         else:
-            # 2) 신규 사용자 자동 생성 (비밀번호 없음 — SSO 전용)
+            # 2) 신규 사용자 자동 생성 (비밀번호 없음 — SSO 전용, SSO 메타데이터 포함)
             user = await self.user_repo.create_user(
                 name=name,
                 email=email,
                 department_id=department_id,
+                sso_provider=sso_provider,
+                sso_id=sso_id,
             )
             # 신규 사용자는 기본 role 'user'
 
-        # SSO 메타데이터 저장 (sso_provider, sso_id)
-        await self.db.execute(
-            """UPDATE users SET sso_provider = ?, sso_id = ? WHERE id = ?""",
-            (sso_provider, sso_id, user["id"]),
-        )
-        await self.db.commit()
-
         # 토큰 생성
         access_token = create_access_token(user["id"])
 
@@ -1,11 +1,94 @@
 """Chat Room Repository"""
 
-import json
-import uuid
+import secrets
+from functools import lru_cache
 from typing import Any, Literal
 
 import aiosqlite
 
+from src.shared import json_utils
+from src.shared.database import read_connection
+
+# 신규 대화방/메시지/멤버 ID는 secrets.token_hex(16): 하이픈 없는 32자 hex
+# (uuid4와 같은 128비트 CSPRNG 값이며 UUID 객체 생성/포맷 비용만 없음, TEXT 컬럼 그대로)
+# 기존 36자 ID와 혼재해도 문자열 비교/조회에는 영향 없음
+
+# INSERT/UPDATE ... RETURNING 에서 작성자 정보를 함께 돌려받기 위한 서브쿼리
+_MESSAGE_RETURNING = (
+    "RETURNING *, (SELECT name FROM users WHERE id = chat_messages.user_id) AS user_name"
+)
+_MEMBER_RETURNING = (
+    "RETURNING *, (SELECT name FROM users WHERE id = chat_room_members.user_id) AS user_name, "
+    "(SELECT email FROM users WHERE id = chat_room_members.user_id) AS user_email"
+)
+
+# 대화방 공유 역할 (user > project > department 우선) — 파라미터: (room_id, user_id) × 3
+_SHARE_ROLE_SQL = """SELECT role FROM (
+    SELECT role, 0 AS precedence FROM shares
+    WHERE resource_type = 'chat_room' AND resource_id = ?
+    AND target_type = 'user' AND target_id = ?
+    UNION ALL
+    SELECT s.role, 1 FROM shares s
+    INNER JOIN project_members pm ON s.target_id = pm.project_id
+    WHERE s.resource_type = 'chat_room' AND s.resource_id = ?
+    AND s.target_type = 'project' AND pm.user_id = ?
+    UNION ALL
+    SELECT s.role, 2 FROM shares s
+    INNER JOIN users u ON s.target_id = u.department_id
+    WHERE s.resource_type = 'chat_room' AND s.resource_id = ?
+    AND s.target_type = 'department' AND u.id = ?
+)
+ORDER BY precedence
+LIMIT 1"""
+
+# 유효 멤버 역할: 직접 멤버 역할, 없으면 member/owner 공유 시 'member' (get_member와 같은 판정)
+# 파라미터: chat_room_id, user_id 다음 (room_id, user_id) × 3
+_MEMBER_ROLE_SQL = f"""COALESCE(
+    (SELECT role FROM chat_room_members WHERE chat_room_id = ? AND user_id = ?),
+    CASE WHEN ({_SHARE_ROLE_SQL}) IN ('member', 'owner') THEN 'member' END
+)"""
+
+# 쓰기 경로 SQL은 모듈 로드 시 한 번만 조립 (호출마다 f-string 재생성 방지,
+# 항상 같은 문자열이므로 sqlite3 statement 캐시도 그대로 적중)
+_INSERT_MESSAGE_SQL = f"""INSERT INTO chat_messages (id, chat_room_id, user_id, role, content, mentions, sources)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    {_MESSAGE_RETURNING}"""
+_INSERT_MEMBER_SQL = f"""INSERT INTO chat_room_members (id, chat_room_id, user_id, role)
+    VALUES (?, ?, ?, ?)
+    {_MEMBER_RETURNING}"""
+_UPDATE_MEMBER_ROLE_SQL = f"""UPDATE chat_room_members SET role = ?
+    WHERE chat_room_id = ? AND user_id = ?
+    {_MEMBER_RETURNING}"""
+
+
+_ROOM_FILTER_COLUMNS = ("owner_id", "room_type", "project_id", "department_id")
+
+
+@lru_cache(maxsize=16)
+def _list_rooms_sql(present: tuple[bool, ...]) -> str:
+    """list_chat_rooms 필터 조합별 SQL (조합당 한 번만 생성해 동일 문자열 재사용)"""
+    conditions = [f"{column} = ?" for column, on in zip(_ROOM_FILTER_COLUMNS, present) if on]
+    where_clause = " AND ".join(conditions) or "1=1"
+    return f"SELECT * FROM chat_rooms WHERE {where_clause} ORDER BY created_at DESC"
+
+
+def _parse_room(row: aiosqlite.Row) -> dict[str, Any]:
+    """대화방 행 → dict (context_sources JSON 파싱)"""
+    data = dict(row)
+    if data.get("context_sources"):
+        data["context_sources"] = json_utils.loads(data["context_sources"])
+    return data
+
+
+def _parse_message(row: aiosqlite.Row) -> dict[str, Any]:
+    """메시지 행 → dict (mentions/sources JSON 파싱)"""
+    data = dict(row)
+    if data.get("mentions"):
+        data["mentions"] = json_utils.loads(data["mentions"])
+    if data.get("sources"):
+        data["sources"] = json_utils.loads(data["sources"])
+    return data
+
 
 class ChatRepository:
     """대화방 관련 데이터베이스 작업"""
@@ -25,15 +108,20 @@ class ChatRepository:
         context_sources: dict | None = None,
     ) -> dict[str, Any]:
         """대화방 생성"""
-        room_id = str(uuid.uuid4())
-        await self.db.execute(
+        room_id = secrets.token_hex(16)
+        cursor = await self.db.execute(
             """INSERT INTO chat_rooms (id, name, room_type, owner_id, project_id, department_id, context_sources)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               RETURNING *""",
             (room_id, name, room_type, owner_id, project_id, department_id, 
-             json.dumps(context_sources) if context_sources else None),
+             json_utils.dumps(context_sources) if context_sources else None),
         )
+        row = await cursor.fetchone()
         await self.db.commit()
-        return await self.get_chat_room(room_id)
+        # 방금 직렬화한 값은 다시 파싱하지 않고 입력 객체를 그대로 사용
+        data = dict(row)
+        data["context_sources"] = context_sources or None
+        return data
 
     async def get_chat_room(self, room_id: str) -> dict[str, Any] | None:
         """대화방 조회"""
@@ -41,12 +129,24 @@ class ChatRepository:
             "SELECT * FROM chat_rooms WHERE id = ?", (room_id,)
         )
         row = await cursor.fetchone()
-        if row:
-            data = dict(row)
-            if data.get("context_sources"):
-                data["context_sources"] = json.loads(data["context_sources"])
-            return data
-        return None
+        return _parse_room(row) if row else None
+
+    async def get_room_with_access(
+        self,
+        room_id: str,
+        user_id: str,
+    ) -> dict[str, Any] | None:
+        """대화방 + 사용자의 유효 멤버 역할을 한 쿼리로 조회
+
+        member_role은 직접 멤버면 해당 역할, member/owner 공유면 'member',
+        둘 다 아니면 None (get_member와 같은 판정). 대화방이 없으면 None.
+        """
+        cursor = await self.db.execute(
+            f"SELECT r.*, {_MEMBER_ROLE_SQL} AS member_role FROM chat_rooms r WHERE r.id = ?",
+            ((room_id, user_id) * 4) + (room_id,),
+        )
+        row = await cursor.fetchone()
+        return _parse_room(row) if row else None
 
     async def list_chat_rooms(
         self,
@@ -56,36 +156,14 @@ class ChatRepository:
         department_id: str | None = None,
     ) -> list[dict[str, Any]]:
         """대화방 목록 조회"""
-        conditions = []
-        params = []
-
-        if owner_id:
-            conditions.append("owner_id = ?")
-            params.append(owner_id)
-        if room_type:
-            conditions.append("room_type = ?")
-            params.append(room_type)
-        if project_id:
-            conditions.append("project_id = ?")
-            params.append(project_id)
-        if department_id:
-            conditions.append("department_id = ?")
-            params.append(department_id)
-
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-        cursor = await self.db.execute(
-            f"SELECT * FROM chat_rooms WHERE {where_clause} ORDER BY created_at DESC",
-            params,
-        )
-        rows = await cursor.fetchall()
-        results = []
-        for row in rows:
-            data = dict(row)
-            if data.get("context_sources"):
-                data["context_sources"] = json.loads(data["context_sources"])
-            results.append(data)
-        return results
+        filters = (owner_id, room_type, project_id, department_id)
+        async with read_connection(self.db) as conn:
+            cursor = await conn.execute(
+                _list_rooms_sql(tuple(bool(value) for value in filters)),
+                [value for value in filters if value],
+            )
+            rows = await cursor.fetchall()
+        return [_parse_room(row) for row in rows]
 
     async def update_chat_room(
         self,
@@ -93,46 +171,43 @@ class ChatRepository:
         name: str | None = None,
         context_sources: dict | None = None,
     ) -> dict[str, Any] | None:
-        """대화방 수정"""
-        updates = []
-        params = []
-
-        if name is not None:
-            updates.append("name = ?")
-            params.append(name)
-        if context_sources is not None:
-            updates.append("context_sources = ?")
-            params.append(json.dumps(context_sources))
-
-        if not updates:
+        """대화방 수정 (None인 필드는 기존 값 유지)"""
+        if name is None and context_sources is None:
             return await self.get_chat_room(room_id)
 
-        params.append(room_id)
-        await self.db.execute(
-            f"UPDATE chat_rooms SET {', '.join(updates)} WHERE id = ?",
-            params,
+        cursor = await self.db.execute(
+            """UPDATE chat_rooms
+               SET name = COALESCE(?, name),
+                   context_sources = COALESCE(?, context_sources)
+               WHERE id = ?
+               RETURNING *""",
+            (
+                name,
+                json_utils.dumps(context_sources) if context_sources is not None else None,
+                room_id,
+            ),
         )
+        row = await cursor.fetchone()
         await self.db.commit()
-        return await self.get_chat_room(room_id)
+        if row is None:
+            return None
+        if context_sources is None:
+            return _parse_room(row)
+        data = dict(row)
+        data["context_sources"] = context_sources
+        return data
 
     async def delete_chat_room(self, room_id: str) -> bool:
-        """대화방 삭제 (관련 메시지, 멤버, 메모리도 함께 삭제)"""
-        # 1. 대화방 메시지 삭제
-        await self.db.execute(
-            "DELETE FROM chat_messages WHERE chat_room_id = ?", (room_id,)
-        )
-        
-        # 2. 대화방 멤버 삭제
-        await self.db.execute(
-            "DELETE FROM chat_room_members WHERE chat_room_id = ?", (room_id,)
-        )
-        
-        # 3. 대화방 메모리 삭제 (scope="chatroom"인 메모리만)
+        """대화방 삭제 (관련 메시지, 멤버, 메모리도 함께 삭제)
+
+        메시지/멤버는 chat_room_id 외래 키의 ON DELETE CASCADE로 함께 삭제된다.
+        """
+        # 1. 대화방 메모리 삭제 (scope="chatroom"인 메모리만 — 외래 키에 CASCADE 없음)
         await self.db.execute(
             "DELETE FROM memories WHERE chat_room_id = ? AND scope = 'chatroom'", (room_id,)
         )
         
-        # 4. 대화방 삭제
+        # 2. 대화방 삭제 (메시지/멤버 CASCADE)
         cursor = await self.db.execute(
             "DELETE FROM chat_rooms WHERE id = ?", (room_id,)
         )
@@ -152,16 +227,20 @@ class ChatRepository:
         sources: dict | None = None,
     ) -> dict[str, Any]:
         """메시지 생성"""
-        message_id = str(uuid.uuid4())
-        await self.db.execute(
-            """INSERT INTO chat_messages (id, chat_room_id, user_id, role, content, mentions, sources)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        message_id = secrets.token_hex(16)
+        cursor = await self.db.execute(
+            _INSERT_MESSAGE_SQL,
             (message_id, chat_room_id, user_id, role, content,
-             json.dumps(mentions) if mentions else None,
-             json.dumps(sources) if sources else None),
+             json_utils.dumps(mentions) if mentions else None,
+             json_utils.dumps(sources) if sources else None),
         )
+        row = await cursor.fetchone()
         await self.db.commit()
-        return await self.get_message(message_id)
+        # 방금 직렬화한 값은 다시 파싱하지 않고 입력 객체를 그대로 사용
+        data = dict(row)
+        data["mentions"] = mentions or None
+        data["sources"] = sources or None
+        return data
 
     async def get_message(self, message_id: str) -> dict[str, Any] | None:
         """메시지 조회"""
@@ -173,68 +252,102 @@ class ChatRepository:
             (message_id,)
         )
         row = await cursor.fetchone()
-        if row:
-            data = dict(row)
-            if data.get("mentions"):
-                data["mentions"] = json.loads(data["mentions"])
-            if data.get("sources"):
-                data["sources"] = json.loads(data["sources"])
-            return data
-        return None
+        return _parse_message(row) if row else None
 
     async def list_messages(
         self,
         chat_room_id: str,
         limit: int = 50,
         offset: int = 0,
-    ) -> list[dict[str, Any]]:
-        """대화방 메시지 목록 조회"""
-        cursor = await self.db.execute(
-            """SELECT m.*, u.name as user_name
-               FROM chat_messages m
-               LEFT JOIN users u ON m.user_id = u.id
-               WHERE m.chat_room_id = ?
-               ORDER BY m.created_at ASC
-               LIMIT ? OFFSET ?""",
-            (chat_room_id, limit, offset),
-        )
-        rows = await cursor.fetchall()
-        results = []
-        for row in rows:
-            data = dict(row)
-            if data.get("mentions"):
-                data["mentions"] = json.loads(data["mentions"])
-            if data.get("sources"):
-                data["sources"] = json.loads(data["sources"])
-            results.append(data)
-        return results
+        after_id: str | None = None,
+        before_id: str | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """대화방 메시지 목록 조회
+
+        after_id(직전 페이지의 마지막 메시지 ID)를 주면 그 다음 메시지부터,
+        before_id(현재 화면의 가장 오래된 메시지 ID)를 주면 그 직전 limit건을 조회한다
+        (keyset 페이지네이션, 둘 다 주면 after_id 우선). OFFSET과 달리 앞선 행을 읽고
+        버리지 않으므로 페이지 깊이와 무관하게 (chat_room_id, created_at) 인덱스 탐색
+        한 번으로 끝난다. 같은 시각의 메시지는 rowid(삽입 순서)로 구분하며,
+        결과는 항상 오래된 것부터 정렬된다.
+        커서(after_id/before_id)가 이 대화방의 메시지가 아니면 None을 반환한다.
+        """
+        cursor_id = after_id if after_id is not None else before_id
+        async with read_connection(self.db) as conn:
+            if cursor_id is not None:
+                cursor = await conn.execute(
+                    "SELECT created_at, rowid FROM chat_messages WHERE id = ? AND chat_room_id = ?",
+                    (cursor_id, chat_room_id),
+                )
+                position = await cursor.fetchone()
+                if position is None:
+                    return None
+
+            if after_id is not None:
+                cursor = await conn.execute(
+                    """SELECT m.*, u.name as user_name
+                       FROM chat_messages m
+                       LEFT JOIN users u ON m.user_id = u.id
+                       WHERE m.chat_room_id = ?
+                       AND (m.created_at, m.rowid) > (?, ?)
+                       ORDER BY m.created_at ASC, m.rowid ASC
+                       LIMIT ?""",
+                    (chat_room_id, position[0], position[1], limit),
+                )
+            elif before_id is not None:
+                cursor = await conn.execute(
+                    """SELECT m.*, u.name as user_name
+                       FROM (
+                           SELECT rowid AS seq FROM chat_messages
+                           WHERE chat_room_id = ?
+                           AND (created_at, rowid) < (?, ?)
+                           ORDER BY created_at DESC, rowid DESC
+                           LIMIT ?
+                       ) page
+                       JOIN chat_messages m ON m.rowid = page.seq
+                       LEFT JOIN users u ON m.user_id = u.id
+                       ORDER BY m.created_at ASC, m.rowid ASC""",
+                    (chat_room_id, position[0], position[1], limit),
+                )
+            else:
+                cursor = await conn.execute(
+                    """SELECT m.*, u.name as user_name
+                       FROM chat_messages m
+                       LEFT JOIN users u ON m.user_id = u.id
+                       WHERE m.chat_room_id = ?
+                       ORDER BY m.created_at ASC, m.rowid ASC
+                       LIMIT ? OFFSET ?""",
+                    (chat_room_id, limit, offset),
+                )
+            rows = await cursor.fetchall()
+        return [_parse_message(row) for row in rows]
 
     async def get_recent_messages(
         self,
         chat_room_id: str,
         limit: int = 20,
     ) -> list[dict[str, Any]]:
-        """최근 메시지 조회 (컨텍스트용)"""
-        cursor = await self.db.execute(
-            """SELECT m.*, u.name as user_name
-               FROM chat_messages m
-               LEFT JOIN users u ON m.user_id = u.id
-               WHERE m.chat_room_id = ?
-               ORDER BY m.created_at DESC
-               LIMIT ?""",
-            (chat_room_id, limit),
-        )
-        rows = await cursor.fetchall()
-        results = []
-        for row in rows:
-            data = dict(row)
-            if data.get("mentions"):
-                data["mentions"] = json.loads(data["mentions"])
-            if data.get("sources"):
-                data["sources"] = json.loads(data["sources"])
-            results.append(data)
-        # 시간순 정렬 (오래된 것부터)
-        return list(reversed(results))
+        """최근 메시지 조회 (컨텍스트용, 오래된 것부터)
+
+        최근 N건의 rowid는 (chat_room_id, created_at) 인덱스만으로 고르고,
+        본문 조회와 시간순 정렬은 바깥 쿼리에서 처리한다.
+        """
+        async with read_connection(self.db) as conn:
+            cursor = await conn.execute(
+                """SELECT m.*, u.name as user_name
+                   FROM (
+                       SELECT rowid AS seq FROM chat_messages
+                       WHERE chat_room_id = ?
+                       ORDER BY created_at DESC, rowid DESC
+                       LIMIT ?
+                   ) recent
+                   JOIN chat_messages m ON m.rowid = recent.seq
+                   LEFT JOIN users u ON m.user_id = u.id
+                   ORDER BY m.created_at ASC, m.rowid ASC""",
+                (chat_room_id, limit),
+            )
+            rows = await cursor.fetchall()
+        return [_parse_message(row) for row in rows]
 
     # ==================== Chat Room Members ====================
 
@@ -245,14 +358,14 @@ class ChatRepository:
         role: str = "member",
     ) -> dict[str, Any]:
         """대화방 멤버 추가"""
-        member_id = str(uuid.uuid4())
-        await self.db.execute(
-            """INSERT INTO chat_room_members (id, chat_room_id, user_id, role)
-               VALUES (?, ?, ?, ?)""",
+        member_id = secrets.token_hex(16)
+        cursor = await self.db.execute(
+            _INSERT_MEMBER_SQL,
             (member_id, chat_room_id, user_id, role),
         )
+        row = await cursor.fetchone()
         await self.db.commit()
-        return await self.get_member(chat_room_id, user_id)
+        return dict(row)
 
     async def get_member(
         self,
@@ -284,63 +397,45 @@ class ChatRepository:
 
         return None
 
-    async def _get_share_role(
+    async def get_member_role(
         self,
         chat_room_id: str,
         user_id: str,
     ) -> str | None:
-        """shares 테이블에서 사용자의 대화방 공유 역할 조회 (user/project/department 레벨)"""
-        # 1. 직접 사용자 공유
+        """유효 멤버 역할만 조회 (권한 체크용, users JOIN/행 dict 생성 없음)"""
         cursor = await self.db.execute(
-            """SELECT role FROM shares
-               WHERE resource_type = 'chat_room' AND resource_id = ?
-               AND target_type = 'user' AND target_id = ?""",
-            (chat_room_id, user_id),
+            f"SELECT {_MEMBER_ROLE_SQL}", (chat_room_id, user_id) * 4
         )
-        row = await cursor.fetchone()
-        if row:
-            return row["role"]
+        return (await cursor.fetchone())[0]
 
-        # 2. 프로젝트 레벨 공유 (사용자가 속한 프로젝트에 공유된 경우)
-        cursor = await self.db.execute(
-            """SELECT s.role FROM shares s
-               INNER JOIN project_members pm ON s.target_id = pm.project_id
-               WHERE s.resource_type = 'chat_room' AND s.resource_id = ?
-               AND s.target_type = 'project' AND pm.user_id = ?""",
-            (chat_room_id, user_id),
-        )
-        row = await cursor.fetchone()
-        if row:
-            return row["role"]
+    async def _get_share_role(
+        self,
+        chat_room_id: str,
+        user_id: str,
+    ) -> str | None:
+        """shares 테이블에서 사용자의 대화방 공유 역할 조회 (user/project/department 레벨)
 
-        # 3. 부서 레벨 공유 (사용자의 부서에 공유된 경우)
-        cursor = await self.db.execute(
-            """SELECT s.role FROM shares s
-               INNER JOIN users u ON s.target_id = u.department_id
-               WHERE s.resource_type = 'chat_room' AND s.resource_id = ?
-               AND s.target_type = 'department' AND u.id = ?""",
-            (chat_room_id, user_id),
-        )
+        세 레벨을 한 쿼리로 조회하고 user > project > department 순으로 우선한다.
+        """
+        cursor = await self.db.execute(_SHARE_ROLE_SQL, (chat_room_id, user_id) * 3)
         row = await cursor.fetchone()
-        if row:
-            return row["role"]
-
-        return None
+        return row["role"] if row else None
 
     async def list_members(
         self,
         chat_room_id: str,
     ) -> list[dict[str, Any]]:
         """대화방 멤버 목록"""
-        cursor = await self.db.execute(
-            """SELECT m.*, u.name as user_name, u.email as user_email
-               FROM chat_room_members m
-               LEFT JOIN users u ON m.user_id = u.id
-               WHERE m.chat_room_id = ?
-               ORDER BY m.role, m.joined_at""",
-            (chat_room_id,),
-        )
-        rows = await cursor.fetchall()
+        async with read_connection(self.db) as conn:
+            cursor = await conn.execute(
+                """SELECT m.*, u.name as user_name, u.email as user_email
+                   FROM chat_room_members m
+                   LEFT JOIN users u ON m.user_id = u.id
+                   WHERE m.chat_room_id = ?
+                   ORDER BY m.role, m.joined_at""",
+                (chat_room_id,),
+            )
+            rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
     async def update_member_role(
@@ -350,12 +445,15 @@ class ChatRepository:
         role: str,
     ) -> dict[str, Any] | None:
         """대화방 멤버 역할 변경"""
-        await self.db.execute(
-            """UPDATE chat_room_members SET role = ?
-               WHERE chat_room_id = ? AND user_id = ?""",
+        cursor = await self.db.execute(
+            _UPDATE_MEMBER_ROLE_SQL,
             (role, chat_room_id, user_id),
         )
+        row = await cursor.fetchone()
         await self.db.commit()
+        if row:
+            return dict(row)
+        # 직접 멤버가 아니면 공유 멤버 정보로 폴백
         return await self.get_member(chat_room_id, user_id)
 
     async def remove_member(
@@ -377,9 +475,20 @@ class ChatRepository:
         chat_room_id: str,
         user_id: str,
     ) -> bool:
-        """멤버 여부 확인"""
-        member = await self.get_member(chat_room_id, user_id)
-        return member is not None
+        """멤버 여부 확인 (직접 멤버 또는 member/owner 공유)
+
+        get_member와 같은 판정을 users JOIN/행 조회 없이 한 쿼리로 수행한다.
+        """
+        cursor = await self.db.execute(
+            f"""SELECT EXISTS(
+                       SELECT 1 FROM chat_room_members
+                       WHERE chat_room_id = ? AND user_id = ?
+                   )
+                   OR COALESCE(({_SHARE_ROLE_SQL}) IN ('member', 'owner'), 0)""",
+            (chat_room_id, user_id, *((chat_room_id, user_id) * 3)),
+        )
+        row = await cursor.fetchone()
+        return bool(row[0])
 
     async def get_project_members(self, project_id: str) -> list[dict[str, Any]]:
         """프로젝트 멤버 목록 조회"""
@@ -408,92 +517,58 @@ class ChatRepository:
         self,
         user_id: str,
     ) -> list[dict[str, Any]]:
-        """사용자가 속한 대화방 목록 (멤버 + 공유받은 대화방)"""
-        # 1. 멤버로 속한 대화방
-        cursor = await self.db.execute(
-            """SELECT r.*, m.role as member_role
-               FROM chat_rooms r
-               INNER JOIN chat_room_members m ON r.id = m.chat_room_id
-               WHERE m.user_id = ?""",
-            (user_id,),
-        )
-        member_rows = await cursor.fetchall()
-
-        # 2. 공유받은 대화방 (user 직접 공유)
-        cursor = await self.db.execute(
-            """SELECT r.*, s.role as share_role
-               FROM chat_rooms r
-               INNER JOIN shares s ON r.id = s.resource_id
-               WHERE s.resource_type = 'chat_room'
-               AND s.target_type = 'user'
-               AND s.target_id = ?""",
-            (user_id,),
-        )
-        shared_user_rows = await cursor.fetchall()
-
-        # 3. 프로젝트 레벨 공유 (사용자가 속한 프로젝트에 공유된 대화방)
-        cursor = await self.db.execute(
-            """SELECT r.*, s.role as share_role
-               FROM chat_rooms r
-               INNER JOIN shares s ON r.id = s.resource_id
-               INNER JOIN project_members pm ON s.target_id = pm.project_id
-               WHERE s.resource_type = 'chat_room'
-               AND s.target_type = 'project'
-               AND pm.user_id = ?""",
-            (user_id,),
-        )
-        shared_project_rows = await cursor.fetchall()
-
-        # 4. 부서 레벨 공유 (사용자의 부서에 공유된 대화방)
-        cursor = await self.db.execute(
-            """SELECT r.*, s.role as share_role
-               FROM chat_rooms r
-               INNER JOIN shares s ON r.id = s.resource_id
-               INNER JOIN users u ON s.target_id = u.department_id
-               WHERE s.resource_type = 'chat_room'
-               AND s.target_type = 'department'
-               AND u.id = ?""",
-            (user_id,),
-        )
-        shared_dept_rows = await cursor.fetchall()
-
-        # 중복 제거 (멤버로 속한 대화방이 우선)
-        seen_ids = set()
-        results = []
-
-        # 멤버 대화방 먼저 추가 (share_role=None)
-        for row in member_rows:
-            data = dict(row)
-            data["share_role"] = None
-            if data.get("context_sources"):
-                data["context_sources"] = json.loads(data["context_sources"])
-            results.append(data)
-            seen_ids.add(data["id"])
-
-        # 공유받은 대화방 추가 (중복 제외, 가장 높은 권한 적용)
-        role_priority = {"owner": 0, "member": 1, "viewer": 2}
-        for rows in [shared_user_rows, shared_project_rows, shared_dept_rows]:
-            for row in rows:
-                data = dict(row)
-                room_id = data["id"]
-                share_role = data.get("share_role", "viewer")
-                if room_id not in seen_ids:
-                    data["member_role"] = share_role
-                    data["share_role"] = share_role
-                    if data.get("context_sources"):
-                        data["context_sources"] = json.loads(data["context_sources"])
-                    results.append(data)
-                    seen_ids.add(room_id)
-                else:
-                    # 이미 추가된 공유 방이면, 더 높은 권한으로 업데이트
-                    for r in results:
-                        if r["id"] == room_id and r.get("share_role"):
-                            if role_priority.get(share_role, 99) < role_priority.get(r["share_role"], 99):
-                                r["member_role"] = share_role
-                                r["share_role"] = share_role
-                            break
-
-        # created_at 기준 정렬
-        results.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-
-        return results
+        """사용자가 속한 대화방 목록 (멤버 + 공유받은 대화방)
+
+        멤버십과 user/project/department 공유를 한 쿼리로 모은 뒤
+        대화방마다 한 행만 남긴다: 멤버로 속한 방이 우선이고,
+        공유만 있는 방은 가장 높은 권한(owner > member > viewer)을 적용한다.
+        """
+        async with read_connection(self.db) as conn:
+            cursor = await conn.execute(
+                """WITH candidates AS (
+                       SELECT m.chat_room_id AS room_id, m.role AS member_role,
+                              NULL AS share_role, 0 AS source_rank, 0 AS role_rank
+                       FROM chat_room_members m
+                       WHERE m.user_id = ?
+                       UNION ALL
+                       SELECT s.resource_id, s.role, s.role, 1,
+                              CASE s.role WHEN 'owner' THEN 0 WHEN 'member' THEN 1
+                                          WHEN 'viewer' THEN 2 ELSE 99 END
+                       FROM shares s
+                       WHERE s.resource_type = 'chat_room'
+                       AND s.target_type = 'user'
+                       AND s.target_id = ?
+                       UNION ALL
+                       SELECT s.resource_id, s.role, s.role, 1,
+                              CASE s.role WHEN 'owner' THEN 0 WHEN 'member' THEN 1
+                                          WHEN 'viewer' THEN 2 ELSE 99 END
+                       FROM shares s
+                       INNER JOIN project_members pm ON s.target_id = pm.project_id
+                       WHERE s.resource_type = 'chat_room'
+                       AND s.target_type = 'project'
+                       AND pm.user_id = ?
+                       UNION ALL
+                       SELECT s.resource_id, s.role, s.role, 1,
+                              CASE s.role WHEN 'owner' THEN 0 WHEN 'member' THEN 1
+                                          WHEN 'viewer' THEN 2 ELSE 99 END
+                       FROM shares s
+                       INNER JOIN users u ON s.target_id = u.department_id
+                       WHERE s.resource_type = 'chat_room'
+                       AND s.target_type = 'department'
+                       AND u.id = ?
+                   ),
+                   ranked AS (
+                       SELECT *, ROW_NUMBER() OVER (
+                           PARTITION BY room_id ORDER BY source_rank, role_rank
+                       ) AS rn
+                       FROM candidates
+                   )
+                   SELECT r.*, ranked.member_role, ranked.share_role
+                   FROM ranked
+                   INNER JOIN chat_rooms r ON r.id = ranked.room_id
+                   WHERE ranked.rn = 1
+                   ORDER BY r.created_at DESC""",
+                (user_id, user_id, user_id, user_id),
+            )
+            rows = await cursor.fetchall()
+        return [_parse_room(row) for row in rows]
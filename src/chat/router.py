@@ -22,7 +22,8 @@ from src.chat.schemas import (
 router = APIRouter()
 
 
-def get_chat_service(db: aiosqlite.Connection = Depends(get_db)) -> ChatService:
+async def get_chat_service(db: aiosqlite.Connection = Depends(get_db)) -> ChatService:
+    # async def: 동기 의존성은 요청마다 스레드풀로 디스패치되므로 이벤트 루프에서 바로 생성
     return ChatService(db)
 
 
@@ -174,12 +175,21 @@ async def get_messages(
     room_id: str,
     limit: int = 50,
     offset: int = 0,
+    after_id: str | None = None,
+    before_id: str | None = None,
     user_id: str = Depends(get_current_user_id),
     service: ChatService = Depends(get_chat_service),
 ):
-    """대화방 메시지 목록 (멤버만)"""
+    """대화방 메시지 목록 (멤버만)
+
+    after_id(직전 페이지 마지막 메시지 ID)를 주면 그 다음 메시지부터,
+    before_id(가장 오래된 표시 메시지 ID)를 주면 그 이전 메시지를 keyset
+    페이지네이션으로 반환한다 (offset은 무시, 결과는 항상 오래된 것부터).
+    """
     try:
-        return await service.get_messages(room_id, user_id, limit, offset)
+        return await service.get_messages(
+            room_id, user_id, limit, offset, after_id=after_id, before_id=before_id
+        )
     except NotFoundException as e:
         raise HTTPException(status_code=404, detail=e.message)
     except ForbiddenException as e:
@@ -138,11 +138,16 @@ class ChatService:
         context_sources: dict | None = None,
     ) -> dict[str, Any]:
         """대화방 수정 (owner/admin만 가능)"""
-        await self._check_admin_permission(room_id, user_id)
-        
-        # 변경 전 상태 확인
-        old_room = await self.repo.get_chat_room(room_id)
+        # 변경 전 상태 확인 + admin 이상 권한 체크
+        old_room = await self._get_room_for_member(room_id, user_id)
+        if old_room["member_role"] not in ["owner", "admin"]:
+            raise ForbiddenException("관리자 권한이 필요합니다")
         old_context_sources = old_room.get("context_sources", {})
+
+        # 변경할 필드가 없으면 방금 조회한 상태를 반환 (추가 조회 생략)
+        # 수정 경로와 같은 형태가 되도록 권한 확인용 member_role은 제외
+        if name is None and context_sources is None:
+            return {k: v for k, v in old_room.items() if k != "member_role"}
         
         # 대화방 업데이트
         updated_room = await self.repo.update_chat_room(room_id, name, context_sources)
@@ -255,11 +260,11 @@ class ChatService:
         if role == "owner":
             raise ForbiddenException("owner 역할은 부여할 수 없습니다")
         
-        member = await self.repo.get_member(room_id, target_user_id)
-        if not member:
+        target_role = await self.repo.get_member_role(room_id, target_user_id)
+        if not target_role:
             raise NotFoundException("대화방 멤버", target_user_id)
         
-        if member["role"] == "owner":
+        if target_role == "owner":
             raise ForbiddenException("owner의 역할은 변경할 수 없습니다")
         
         return await self.repo.update_member_role(room_id, target_user_id, role)
@@ -271,52 +276,59 @@ class ChatService:
         target_user_id: str,
     ) -> bool:
         """멤버 제거"""
-        member = await self.repo.get_member(room_id, user_id)
-        if not member:
-            raise ForbiddenException("대화방 멤버가 아닙니다")
+        role = await self._check_member_permission(room_id, user_id)
         
         if user_id == target_user_id:
-            if member["role"] == "owner":
+            if role == "owner":
                 raise ForbiddenException("owner는 대화방을 나갈 수 없습니다")
             return await self.repo.remove_member(room_id, target_user_id)
         
-        if member["role"] not in ["owner", "admin"]:
+        if role not in ["owner", "admin"]:
             raise ForbiddenException("멤버를 제거할 권한이 없습니다")
         
-        target_member = await self.repo.get_member(room_id, target_user_id)
-        if not target_member:
+        target_role = await self.repo.get_member_role(room_id, target_user_id)
+        if not target_role:
             raise NotFoundException("대화방 멤버", target_user_id)
         
-        if target_member["role"] == "owner":
+        if target_role == "owner":
             raise ForbiddenException("owner는 강퇴할 수 없습니다")
         
-        if member["role"] == "admin" and target_member["role"] == "admin":
+        if role == "admin" and target_role == "admin":
             raise ForbiddenException("admin은 다른 admin을 강퇴할 수 없습니다")
         
         return await self.repo.remove_member(room_id, target_user_id)
 
     # ==================== Permission Check ====================
 
-    async def _check_member_permission(self, room_id: str, user_id: str) -> dict[str, Any]:
-        """멤버 권한 체크"""
-        member = await self.repo.get_member(room_id, user_id)
-        if not member:
+    async def _check_member_permission(self, room_id: str, user_id: str) -> str:
+        """멤버 권한 체크 (유효 역할 반환)"""
+        role = await self.repo.get_member_role(room_id, user_id)
+        if not role:
             raise ForbiddenException("대화방 멤버가 아닙니다")
-        return member
+        return role
 
-    async def _check_admin_permission(self, room_id: str, user_id: str) -> dict[str, Any]:
+    async def _check_admin_permission(self, room_id: str, user_id: str) -> str:
         """admin 이상 권한 체크"""
-        member = await self._check_member_permission(room_id, user_id)
-        if member["role"] not in ["owner", "admin"]:
+        role = await self._check_member_permission(room_id, user_id)
+        if role not in ["owner", "admin"]:
             raise ForbiddenException("관리자 권한이 필요합니다")
-        return member
+        return role
 
-    async def _check_owner_permission(self, room_id: str, user_id: str) -> dict[str, Any]:
+    async def _get_room_for_member(self, room_id: str, user_id: str) -> dict[str, Any]:
+        """대화방 조회 + 멤버 권한 체크 (한 쿼리)"""
+        room = await self.repo.get_room_with_access(room_id, user_id)
+        if not room:
+            raise NotFoundException("대화방", room_id)
+        if not room["member_role"]:
+            raise ForbiddenException("대화방 멤버가 아닙니다")
+        return room
+
+    async def _check_owner_permission(self, room_id: str, user_id: str) -> str:
         """owner 권한 체크"""
-        member = await self._check_member_permission(room_id, user_id)
-        if member["role"] != "owner":
+        role = await self._check_member_permission(room_id, user_id)
+        if role != "owner":
             raise ForbiddenException("소유자 권한이 필요합니다")
-        return member
+        return role
 
     # ==================== Chat Messages ====================
 
@@ -327,8 +339,7 @@ class ChatService:
         content: str,
     ) -> dict[str, Any]:
         """메시지 전송 (멤버만 가능)"""
-        room = await self.get_chat_room(chat_room_id)
-        await self._check_member_permission(chat_room_id, user_id)
+        room = await self._get_room_for_member(chat_room_id, user_id)
         
         command_match = re.match(COMMAND_PATTERN, content.strip())
         if command_match:
@@ -558,8 +569,8 @@ class ChatService:
             return "❌ 초대할 사용자 이메일을 입력하세요.\n\n예: `/invite kim@samsung.com`"
         
         try:
-            member = await self.repo.get_member(room["id"], user_id)
-            if not member or member["role"] not in ["owner", "admin"]:
+            role = await self.repo.get_member_role(room["id"], user_id)
+            if role not in ["owner", "admin"]:
                 return "❌ 멤버를 초대할 권한이 없습니다. (owner/admin만 가능)"
             
             email = args.strip()
@@ -608,11 +619,17 @@ AI가 해당 메모리들도 참조합니다."""
         user_id: str,
         limit: int = 50,
         offset: int = 0,
+        after_id: str | None = None,
+        before_id: str | None = None,
     ) -> list[dict[str, Any]]:
         """대화방 메시지 목록 (멤버만)"""
-        await self.get_chat_room(chat_room_id)
-        await self._check_member_permission(chat_room_id, user_id)
-        return await self.repo.list_messages(chat_room_id, limit, offset)
+        await self._get_room_for_member(chat_room_id, user_id)
+        messages = await self.repo.list_messages(
+            chat_room_id, limit, offset, after_id=after_id, before_id=before_id
+        )
+        if messages is None:
+            raise NotFoundException("메시지", after_id if after_id is not None else before_id)
+        return messages
 
     # ==================== AI Response ====================
 
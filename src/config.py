@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     qdrant_url: str = "http://localhost:6333"
     qdrant_collection: str = "ai-memory-agent"
     qdrant_api_key: str | None = None
+    qdrant_scalar_quantization: bool = True  # int8 양자화 인덱스 + 원본 벡터 재채점
 
     # Embedding Provider
     embedding_provider: Literal["openai", "ollama", "huggingface"] = "huggingface"
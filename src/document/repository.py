@@ -116,6 +116,24 @@ class DocumentRepository:
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
+    async def get_chunks_by_keys(
+        self, keys: list[tuple[str, int]]
+    ) -> dict[tuple[str, int], dict[str, Any]]:
+        """(document_id, chunk_index) 목록으로 청크 배치 조회 (N+1 방지)"""
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+
+        placeholders = ",".join("(?, ?)" for _ in unique_keys)
+        params = [v for key in unique_keys for v in key]
+        cursor = await self.db.execute(
+            f"""SELECT * FROM document_chunks
+                WHERE (document_id, chunk_index) IN (VALUES {placeholders})""",
+            params,
+        )
+        rows = await cursor.fetchall()
+        return {(row["document_id"], row["chunk_index"]): dict(row) for row in rows}
+
     async def get_chunk_vector_ids(self, document_id: str) -> list[str]:
         cursor = await self.db.execute(
             "SELECT vector_id FROM document_chunks WHERE document_id = ? AND vector_id IS NOT NULL",
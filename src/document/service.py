@@ -13,7 +13,7 @@ import chardet
 from PyPDF2 import PdfReader
 
 from src.document.repository import DocumentRepository
-from src.shared.vector_store import upsert_vector, delete_vector, search_vectors
+from src.shared.vector_store import upsert_vectors, delete_vector, search_vectors
 
 # 슬라이드 이미지 저장 기본 경로
 SLIDES_DATA_DIR = Path("data/slides")
@@ -81,6 +81,8 @@ class DocumentService:
         except Exception:
             pass
 
+        # 벡터는 모아서 문서당 한 번에 저장 (청크별 Qdrant 왕복 제거)
+        points: list[tuple[str, list[float], dict[str, Any]]] = []
         for i, chunk_text in enumerate(chunks):
             vector_id = str(uuid.uuid4())
             vector = None
@@ -102,14 +104,15 @@ class DocumentService:
                 pass
 
             if vector:
-                await upsert_vector(vector_id, vector, {
+                points.append((vector_id, vector, {
                     "document_id": doc["id"],
                     "chunk_index": i,
                     "chat_room_id": chat_room_id,
                     "owner_id": owner_id,
                     "scope": "document",
-                })
+                }))
 
+        await upsert_vectors(points)
         await self.repo.update_document_status(doc["id"], "completed", len(chunks))
 
         if chat_room_id:
@@ -138,6 +141,7 @@ class DocumentService:
         except Exception:
             pass
 
+        points: list[tuple[str, list[float], dict[str, Any]]] = []
         for i, slide_text in enumerate(slides_text):
             slide_number = i + 1
             vector_id = str(uuid.uuid4())
@@ -171,15 +175,16 @@ class DocumentService:
                 pass
 
             if vector:
-                await upsert_vector(vector_id, vector, {
+                points.append((vector_id, vector, {
                     "document_id": doc["id"],
                     "chunk_index": i,
                     "slide_number": slide_number,
                     "chat_room_id": chat_room_id,
                     "owner_id": owner_id,
                     "scope": "document",
-                })
+                }))
 
+        await upsert_vectors(points)
         await self.repo.update_document_status(doc["id"], "completed", len(slides_text))
 
         if chat_room_id:
@@ -13,7 +13,7 @@ from src.shared.database import init_database, close_database
 from src.shared.vector_store import init_vector_store, close_vector_store, is_vector_store_available
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=get_settings().log_level.upper(),
     format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
 )
 logger = logging.getLogger("main")
@@ -28,6 +28,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await init_database()
     await init_vector_store()
 
+    # 임베딩 provider는 요청 경로가 아닌 기동 시점에 한 번 생성
+    from src.shared.providers import get_embedding_provider
+    embedding_provider = get_embedding_provider()
+
+    # 더 이상 설정되지 않은 모델의 임베딩 캐시 정리
+    from src.shared.database import get_db_sync
+    from src.shared.embedding_cache import prune_embedding_cache, provider_key
+    cache_db = await get_db_sync()
+    try:
+        await prune_embedding_cache(cache_db, keep=provider_key(embedding_provider))
+        await cache_db.commit()
+    finally:
+        await cache_db.close()
+
+    # Webhook 재시도 디스패처 시작
+    from src.agent.webhook import start_webhook_dispatcher
+    await start_webhook_dispatcher()
+
     # Mchat worker 시작
     mchat_task = None
     if settings.mchat_enabled and settings.mchat_token:
@@ -57,6 +75,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             pass
 
     # 종료 시 정리
+    from src.agent.webhook import (
+        close_webhook_client,
+        stop_webhook_dispatcher,
+        stop_webhook_workers,
+    )
+    await stop_webhook_dispatcher()
+    await stop_webhook_workers()
+    await close_webhook_client()
     await close_database()
     await close_vector_store()
 
@@ -1,12 +1,13 @@
 """Memory Repository - 데이터 접근 계층"""
 
-import json
 import uuid
 from datetime import datetime
 from typing import Any, Literal
 
 import aiosqlite
 
+from src.shared import json_utils
+
 
 class MemoryRepository:
     """메모리 관련 데이터베이스 작업"""
@@ -29,9 +30,12 @@ class MemoryRepository:
         superseded: bool = False,
         superseded_by: str | None = None,
         superseded_at: str | None = None,
+        memory_id: str | None = None,
+        commit: bool = True,
     ) -> dict[str, Any]:
-        """메모리 생성"""
-        memory_id = str(uuid.uuid4())
+        """메모리 생성 (memory_id를 넘기면 해당 ID 사용 — 벡터 payload와 동시 저장용,
+        commit=False면 호출자가 커밋)"""
+        memory_id = memory_id or str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
 
         await self.db.execute(
@@ -49,7 +53,7 @@ class MemoryRepository:
                 source_message_id,
                 category,
                 importance,
-                json.dumps(metadata) if metadata else None,
+                json_utils.dumps(metadata) if metadata else None,
                 topic_key,
                 1 if superseded else 0,
                 superseded_by,
@@ -58,9 +62,44 @@ class MemoryRepository:
                 now,
             ),
         )
-        await self.db.commit()
+        if commit:
+            await self.db.commit()
         return await self.get_memory(memory_id)
 
+    async def create_memories_many(
+        self,
+        rows: list[dict[str, Any]],
+        commit: bool = True,
+    ) -> None:
+        """메모리 일괄 생성 (executemany 1회)
+
+        rows: id, content, owner_id, scope, vector_id, category, importance,
+        metadata 키를 가진 dict 목록 (id는 호출자가 생성 — 벡터 payload와 공유)
+        """
+        now = datetime.utcnow().isoformat()
+        await self.db.executemany(
+            """INSERT INTO memories
+               (id, content, vector_id, scope, owner_id, category, importance, metadata, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    row["id"],
+                    row["content"],
+                    row.get("vector_id"),
+                    row["scope"],
+                    row["owner_id"],
+                    row.get("category"),
+                    row.get("importance", "medium"),
+                    json_utils.dumps(row["metadata"]) if row.get("metadata") else None,
+                    now,
+                    now,
+                )
+                for row in rows
+            ],
+        )
+        if commit:
+            await self.db.commit()
+
     async def get_memory(self, memory_id: str) -> dict[str, Any] | None:
         """메모리 조회"""
         cursor = await self.db.execute(
@@ -70,7 +109,7 @@ class MemoryRepository:
         if row:
             data = dict(row)
             if data.get("metadata"):
-                data["metadata"] = json.loads(data["metadata"])
+                data["metadata"] = json_utils.loads(data["metadata"])
             return data
         return None
 
@@ -112,7 +151,7 @@ class MemoryRepository:
         for row in rows:
             data = dict(row)
             if data.get("metadata"):
-                data["metadata"] = json.loads(data["metadata"])
+                data["metadata"] = json_utils.loads(data["metadata"])
             results.append(data)
         
         # agent_instance_id 필터링 (Python 레벨)
@@ -153,7 +192,7 @@ class MemoryRepository:
             params.append(importance)
         if metadata is not None:
             updates.append("metadata = ?")
-            params.append(json.dumps(metadata))
+            params.append(json_utils.dumps(metadata))
 
         if not updates:
             return await self.get_memory(memory_id)
@@ -198,7 +237,7 @@ class MemoryRepository:
         for row in rows:
             data = dict(row)
             if data.get("metadata"):
-                data["metadata"] = json.loads(data["metadata"])
+                data["metadata"] = json_utils.loads(data["metadata"])
             results.append(data)
         return results
 
@@ -219,7 +258,7 @@ class MemoryRepository:
         for row in rows:
             data = dict(row)
             if data.get("metadata"):
-                data["metadata"] = json.loads(data["metadata"])
+                data["metadata"] = json_utils.loads(data["metadata"])
             results.append(data)
         return results
 
@@ -392,6 +431,6 @@ class MemoryRepository:
         for row in rows:
             data = dict(row)
             if data.get("metadata"):
-                data["metadata"] = json.loads(data["metadata"])
+                data["metadata"] = json_utils.loads(data["metadata"])
             results.append(data)
         return results
@@ -7,7 +7,7 @@ from src.config import get_settings
 from src.shared.database import init_database, close_database, get_db_sync
 from src.shared.vector_store import init_vector_store, close_vector_store, upsert_vector
 from src.shared.providers import get_embedding_provider
-from src.shared.auth import hash_password
+from src.shared.auth import api_key_hint, hash_api_key, hash_password
 
 # ==================== 샘플 데이터 정의 ====================
 
@@ -560,14 +560,14 @@ async def seed_data():
             now = (datetime.now(timezone.utc) + timedelta(hours=9)).isoformat()
             
             await db.execute(
-                """INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, status, created_at, updated_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                """INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, api_key_hash, status, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
                 (agent_instance_id, agent_type_ids[agent_instance["agent_type_idx"]],
                   agent_instance["name"], user_ids[agent_instance["owner_idx"]],
-                  api_key, agent_instance["status"], now, now),
+                  api_key_hint(api_key), hash_api_key(api_key), agent_instance["status"], now, now),
             )
             agent_instance_ids.append(agent_instance_id)
-            print(f"  ✓ {agent_instance['name']} (API Key: {api_key[:20]}...)")
+            print(f"  ✓ {agent_instance['name']} (API Key: {api_key})")
         
         # 9. External User Mappings 생성
         print("\n🔗 External User Mappings 생성...")
@@ -19,7 +19,7 @@ from src.config import get_settings
 from src.shared.database import init_database, close_database, get_db_sync
 from src.shared.vector_store import init_vector_store, close_vector_store, upsert_vector
 from src.shared.providers import get_embedding_provider
-from src.shared.auth import hash_password
+from src.shared.auth import api_key_hint, hash_api_key, hash_password
 
 
 # ==================== 데모 데이터 정의 ====================
@@ -348,14 +348,16 @@ async def seed_demo():
         # ---- 8. Agent Instances ----
         print("\n🤖 Agent Instances...")
         ainst_ids = []
+        ainst_keys = []
         for ai_inst in AGENT_INSTANCES:
             aiid = str(uuid.uuid4())
             api_key = f"sk_{uuid.uuid4().hex}"
             now = now_fn()
             await db.execute(
-                "INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (aiid, atype_ids[ai_inst["agent_type_idx"]], ai_inst["name"], user_ids[ai_inst["owner_idx"]], api_key, ai_inst["status"], now, now))
+                "INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, api_key_hash, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (aiid, atype_ids[ai_inst["agent_type_idx"]], ai_inst["name"], user_ids[ai_inst["owner_idx"]], api_key_hint(api_key), hash_api_key(api_key), ai_inst["status"], now, now))
             ainst_ids.append(aiid)
+            ainst_keys.append(api_key)
             print(f"  ✓ {ai_inst['name']} (key: {api_key[:20]}...)")
 
         # ---- 9. External User Mappings ----
@@ -535,10 +537,7 @@ async def seed_demo():
         print(f"  developer: developer@samsung.com / {test_password}")
         print()
         print("📌 Agent Instance API Keys:")
-        for i, ai_inst in enumerate(AGENT_INSTANCES):
-            cur = await db.execute("SELECT api_key FROM agent_instances WHERE id = ?", (ainst_ids[i],))
-            row = await cur.fetchone()
-            key = row[0] if row else "N/A"
+        for ai_inst, key in zip(AGENT_INSTANCES, ainst_keys):
             print(f"  {ai_inst['name']}: {key}")
         print()
         print("📌 주요 대화방:")
@@ -4,6 +4,7 @@ import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 import hashlib
+import hmac
 import base64
 
 from fastapi import Depends, Header, HTTPException
@@ -34,9 +35,26 @@ def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None)
     return token
 
 
+# 검증된 토큰 캐시: (서명 키, sha256(토큰)) → (user_id, 만료 시각)
+# 키를 포함하므로 서명 키가 바뀌면 기존 항목은 자연스럽게 무효화된다.
+# 토큰 원문을 프로세스 메모리에 남기지 않도록 다이제스트로 보관
+TOKEN_CACHE_SIZE = 8192
+_token_cache: dict[tuple[str, bytes], tuple[str, datetime]] = {}
+
+
 def verify_access_token(token: str) -> Optional[str]:
-    """액세스 토큰 검증 및 user_id 반환"""
+    """액세스 토큰 검증 및 user_id 반환 (검증 결과는 만료 시각까지 캐시)"""
     settings = get_settings()
+    secret = settings.jwt_secret_key
+    cache_key = (secret, hashlib.sha256(token.encode()).digest())
+
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        user_id, expire = cached
+        if datetime.utcnow() > expire:
+            _token_cache.pop(cache_key, None)
+            return None
+        return user_id
     
     try:
         # Base64 디코딩
@@ -48,17 +66,20 @@ def verify_access_token(token: str) -> Optional[str]:
         
         user_id, expire_str, signature = parts
         
-        # 서명 검증
-        secret = settings.jwt_secret_key
+        # 서명 검증 (상수 시간 비교)
         expected_signature = hashlib.sha256(f"{user_id}|{expire_str}|{secret}".encode()).hexdigest()[:32]
         
-        if signature != expected_signature:
+        if not hmac.compare_digest(signature, expected_signature):
             return None
         
         # 만료 검증
         expire = datetime.fromisoformat(expire_str)
         if datetime.utcnow() > expire:
             return None
+
+        if len(_token_cache) >= TOKEN_CACHE_SIZE:
+            _token_cache.clear()
+        _token_cache[cache_key] = (user_id, expire)
         
         return user_id
         
@@ -66,6 +87,16 @@ def verify_access_token(token: str) -> Optional[str]:
         return None
 
 
+def hash_api_key(api_key: str) -> bytes:
+    """API Key 조회용 해시 (SHA-256 다이제스트) — DB 조회/캐시 키에 평문 대신 사용"""
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+def api_key_hint(api_key: str) -> str:
+    """API Key 표시용 접두사 — DB에는 평문 대신 이 값만 저장"""
+    return f"{api_key[:7]}…"
+
+
 def hash_password(password: str) -> str:
     """비밀번호 해싱"""
     salt = secrets.token_hex(16)
@@ -78,12 +109,12 @@ def verify_password(password: str, hashed: str) -> bool:
     try:
         salt, hash_value = hashed.split("$")
         expected_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return hash_value == expected_hash.hex()
+        return hmac.compare_digest(hash_value, expected_hash.hex())
     except Exception:
         return False
 
 
-def get_current_user_id(
+async def get_current_user_id(
     authorization: Optional[str] = Header(None),
     x_user_id: Optional[str] = Header(None, alias="X-User-ID"),
 ) -> str:
@@ -91,6 +122,8 @@ def get_current_user_id(
     현재 사용자 ID 추출
     - Bearer 토큰 우선 확인
     - X-User-ID 헤더 폴백 (개발 환경)
+
+    블로킹 작업이 없으므로 async 의존성으로 두어 스레드풀 디스패치를 피한다.
     """
     # Bearer 토큰 확인
     if authorization and authorization.startswith("Bearer "):
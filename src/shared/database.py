@@ -1,14 +1,46 @@
 """SQLite 데이터베이스 관리"""
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import aiosqlite
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, AsyncIterator
 
 from src.config import get_settings
 
-# 전역 데이터베이스 연결
+# 전역 데이터베이스 연결 (쓰기 + 읽기)
 _db_connection: aiosqlite.Connection | None = None
 
+# 읽기 전용 연결 풀
+# WAL 모드에서는 읽기 연결이 쓰기 연결과 병렬로 동작하므로,
+# 목록 조회 같은 읽기 전용 쿼리를 공유 연결의 직렬 큐에서 분리한다.
+READ_POOL_SIZE = 4
+_read_pool: asyncio.Queue[aiosqlite.Connection] | None = None
+_read_connections: list[aiosqlite.Connection] = []
+
+# 연결 튜닝 PRAGMA
+# - WAL: 읽기가 쓰기를 막지 않음 (WebSocket/워커 연결과 공유 DB 파일)
+# - synchronous=NORMAL: WAL 모드에서 안전한 수준으로 fsync 횟수 감소
+# - cache_size: 페이지 캐시 64MB (음수 = KiB 단위)
+# - mmap_size: 256MB 메모리 매핑 읽기
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+async def configure_connection(conn: aiosqlite.Connection) -> None:
+    """연결 공통 설정 (row_factory + PRAGMA) 적용"""
+    conn.row_factory = aiosqlite.Row
+    for pragma in CONNECTION_PRAGMAS:
+        await conn.execute(pragma)
+
 
 # SQL 스키마 정의
 SCHEMA_SQL = """
@@ -28,6 +60,8 @@ CREATE TABLE IF NOT EXISTS users (
     password_hash TEXT,
     role TEXT DEFAULT 'user',
     department_id TEXT,
+    sso_provider TEXT,
+    sso_id TEXT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (department_id) REFERENCES departments(id)
@@ -277,8 +311,14 @@ CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_projects_department ON projects(department_id);
 CREATE INDEX IF NOT EXISTS idx_project_members_project ON project_members(project_id);
 CREATE INDEX IF NOT EXISTS idx_project_members_user ON project_members(user_id);
+CREATE INDEX IF NOT EXISTS idx_project_members_user_project ON project_members(user_id, project_id);
 CREATE INDEX IF NOT EXISTS idx_chat_rooms_owner ON chat_rooms(owner_id);
 CREATE INDEX IF NOT EXISTS idx_chat_rooms_type ON chat_rooms(room_type);
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_created ON chat_rooms(created_at DESC);
+-- 유형별 대화방 목록 부분 인덱스 (list_chat_rooms 필터 + created_at DESC 정렬을 인덱스로 처리)
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_owner_personal ON chat_rooms(owner_id, created_at DESC) WHERE room_type = 'personal';
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_project ON chat_rooms(project_id, created_at DESC) WHERE room_type = 'project';
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_department ON chat_rooms(department_id, created_at DESC) WHERE room_type = 'department';
 CREATE INDEX IF NOT EXISTS idx_memories_owner ON memories(owner_id);
 CREATE INDEX IF NOT EXISTS idx_memories_scope ON memories(scope);
 CREATE INDEX IF NOT EXISTS idx_memories_project ON memories(project_id);
@@ -290,8 +330,12 @@ CREATE INDEX IF NOT EXISTS idx_memory_access_log_memory ON memory_access_log(mem
 CREATE INDEX IF NOT EXISTS idx_memory_access_log_user ON memory_access_log(user_id);
 CREATE INDEX IF NOT EXISTS idx_chat_messages_room ON chat_messages(chat_room_id);
 CREATE INDEX IF NOT EXISTS idx_chat_messages_user ON chat_messages(user_id);
+-- 대화방 메시지 시간순 조회 (list_messages/get_recent_messages 정렬을 인덱스로 처리)
+CREATE INDEX IF NOT EXISTS idx_chat_messages_room_created ON chat_messages(chat_room_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_chat_room_members_room ON chat_room_members(chat_room_id);
 CREATE INDEX IF NOT EXISTS idx_chat_room_members_user ON chat_room_members(user_id);
+-- 사용자별 대화방/역할 조회 커버링 인덱스 (get_user_rooms)
+CREATE INDEX IF NOT EXISTS idx_chat_room_members_user_room ON chat_room_members(user_id, chat_room_id, role);
 CREATE INDEX IF NOT EXISTS idx_documents_owner ON documents(owner_id);
 CREATE INDEX IF NOT EXISTS idx_documents_chat_room ON documents(chat_room_id);
 CREATE INDEX IF NOT EXISTS idx_document_chunks_document ON document_chunks(document_id);
@@ -300,6 +344,8 @@ CREATE INDEX IF NOT EXISTS idx_document_chat_rooms_room ON document_chat_rooms(c
 CREATE INDEX IF NOT EXISTS idx_shares_resource ON shares(resource_type, resource_id);
 CREATE INDEX IF NOT EXISTS idx_shares_target ON shares(target_type, target_id);
 CREATE INDEX IF NOT EXISTS idx_shares_created_by ON shares(created_by);
+-- 대상별 공유 대화방/역할 조회 커버링 인덱스 (get_user_rooms)
+CREATE INDEX IF NOT EXISTS idx_shares_target_lookup ON shares(target_type, target_id, resource_type, resource_id, role);
 
 -- 엔티티 인덱스
 CREATE INDEX IF NOT EXISTS idx_entities_name_normalized ON entities(name_normalized);
@@ -337,7 +383,8 @@ CREATE TABLE IF NOT EXISTS agent_instances (
     agent_type_id TEXT NOT NULL,
     name TEXT NOT NULL,
     owner_id TEXT NOT NULL,
-    api_key TEXT UNIQUE NOT NULL,
+    api_key TEXT,  -- 표시용 접두사 (평문 키는 저장하지 않음)
+    api_key_hash BLOB,
     config TEXT,
     webhook_url TEXT,
     status TEXT DEFAULT 'active',
@@ -394,7 +441,6 @@ CREATE INDEX IF NOT EXISTS idx_agent_types_developer ON agent_types(developer_id
 CREATE INDEX IF NOT EXISTS idx_agent_types_status ON agent_types(status);
 CREATE INDEX IF NOT EXISTS idx_agent_instances_owner ON agent_instances(owner_id);
 CREATE INDEX IF NOT EXISTS idx_agent_instances_type ON agent_instances(agent_type_id);
-CREATE INDEX IF NOT EXISTS idx_agent_instances_api_key ON agent_instances(api_key);
 CREATE INDEX IF NOT EXISTS idx_agent_data_instance ON agent_data(agent_instance_id);
 CREATE INDEX IF NOT EXISTS idx_agent_data_user ON agent_data(internal_user_id);
 CREATE INDEX IF NOT EXISTS idx_agent_data_created ON agent_data(created_at);
@@ -480,11 +526,22 @@ CREATE TABLE IF NOT EXISTS webhook_events (
     attempts INTEGER DEFAULT 0,
     last_attempt_at DATETIME,
     response_status INTEGER,
+    next_attempt_at DATETIME,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (agent_instance_id) REFERENCES agent_instances(id) ON DELETE CASCADE
 );
 CREATE INDEX IF NOT EXISTS idx_webhook_events_instance ON webhook_events(agent_instance_id);
 CREATE INDEX IF NOT EXISTS idx_webhook_events_status ON webhook_events(status);
+
+-- 임베딩 캐시 (동일 텍스트 재임베딩 방지, vector는 float32 BLOB)
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    content_hash TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (content_hash, provider, model)
+);
 """
 
 
@@ -500,10 +557,9 @@ async def init_database() -> None:
 
     # 연결 생성
     _db_connection = await aiosqlite.connect(db_path)
-    _db_connection.row_factory = aiosqlite.Row
 
-    # 외래 키 활성화
-    await _db_connection.execute("PRAGMA foreign_keys = ON")
+    # row_factory + 외래 키 + WAL 등 PRAGMA 적용
+    await configure_connection(_db_connection)
 
     # 스키마 생성
     await _db_connection.executescript(SCHEMA_SQL)
@@ -869,6 +925,7 @@ async def init_database() -> None:
                 attempts INTEGER DEFAULT 0,
                 last_attempt_at DATETIME,
                 response_status INTEGER,
+                next_attempt_at DATETIME,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (agent_instance_id) REFERENCES agent_instances(id) ON DELETE CASCADE
             );
@@ -879,6 +936,21 @@ async def init_database() -> None:
     except Exception:
         pass
 
+    # next_attempt_at 컬럼 추가 (webhook_events 재시도 outbox)
+    try:
+        await _db_connection.execute("ALTER TABLE webhook_events ADD COLUMN next_attempt_at DATETIME")
+        await _db_connection.commit()
+    except Exception:
+        pass
+
+    try:
+        await _db_connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_webhook_events_due ON webhook_events(status, next_attempt_at)"
+        )
+        await _db_connection.commit()
+    except Exception:
+        pass
+
     # rate_limit_per_minute 컬럼 추가 (agent_instances)
     try:
         await _db_connection.execute("ALTER TABLE agent_instances ADD COLUMN rate_limit_per_minute INTEGER DEFAULT 60")
@@ -886,6 +958,44 @@ async def init_database() -> None:
     except Exception:
         pass
 
+    # api_key_hash 컬럼 추가 (agent_instances) — API Key 인증은 해시로 조회
+    try:
+        await _db_connection.execute("ALTER TABLE agent_instances ADD COLUMN api_key_hash BLOB")
+        await _db_connection.commit()
+    except Exception:
+        pass
+
+    try:
+        await _db_connection.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_agent_instances_api_key_hash ON agent_instances(api_key_hash)"
+        )
+        await _db_connection.commit()
+    except Exception:
+        pass
+
+    # 기존 인스턴스의 api_key_hash 채우기
+    try:
+        from src.shared.auth import hash_api_key
+
+        cursor = await _db_connection.execute(
+            "SELECT id, api_key FROM agent_instances WHERE api_key_hash IS NULL"
+        )
+        rows = await cursor.fetchall()
+        if rows:
+            await _db_connection.executemany(
+                "UPDATE agent_instances SET api_key_hash = ? WHERE id = ?",
+                [(hash_api_key(row["api_key"]), row["id"]) for row in rows],
+            )
+            await _db_connection.commit()
+    except Exception:
+        pass
+
+    # 평문 api_key 제거 (해시 채우기 이후에 수행)
+    try:
+        await _drop_plaintext_api_keys(_db_connection)
+    except Exception:
+        pass
+
     # SSO 컬럼 추가 (users)
     try:
         await _db_connection.execute("ALTER TABLE users ADD COLUMN sso_provider TEXT")
@@ -922,12 +1032,80 @@ async def init_database() -> None:
     except Exception:
         pass
 
+    # 읽기 전용 연결 풀 (스키마/마이그레이션 적용 후 생성)
+    await _init_read_pool(db_path)
+
     print(f"✅ SQLite 데이터베이스 초기화 완료: {db_path}")
 
 
+async def _drop_plaintext_api_keys(conn: aiosqlite.Connection) -> None:
+    """agent_instances.api_key의 NOT NULL/UNIQUE 제약을 풀고 평문을 표시용 접두사로 교체
+
+    기존 DB는 테이블을 재생성해야 제약을 바꿀 수 있으므로 제약이 남아 있을 때만 재생성한다.
+    호출 전에 api_key_hash가 채워져 있어야 한다.
+    """
+    from src.shared.auth import api_key_hint
+
+    cursor = await conn.execute("PRAGMA table_info(agent_instances)")
+    columns = {row["name"]: row for row in await cursor.fetchall()}
+    cursor = await conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'agent_instances'"
+    )
+    create_sql = (await cursor.fetchone())["sql"]
+    if columns["api_key"]["notnull"] and "api_key TEXT UNIQUE NOT NULL" in create_sql:
+        create_sql = create_sql.replace("api_key TEXT UNIQUE NOT NULL", "api_key TEXT", 1)
+        create_sql = create_sql.replace("agent_instances", "agent_instances_new", 1)
+
+        # DROP TABLE이 자식 테이블의 ON DELETE CASCADE를 일으키지 않도록 외래 키를 잠시 끔
+        await conn.commit()
+        await conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            await conn.execute(create_sql)
+            await conn.execute("INSERT INTO agent_instances_new SELECT * FROM agent_instances")
+            await conn.execute("DROP TABLE agent_instances")
+            await conn.execute("ALTER TABLE agent_instances_new RENAME TO agent_instances")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_instances_owner ON agent_instances(owner_id)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_instances_type ON agent_instances(agent_type_id)")
+            await conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_agent_instances_api_key_hash ON agent_instances(api_key_hash)"
+            )
+            await conn.commit()
+        finally:
+            await conn.execute("PRAGMA foreign_keys = ON")
+
+    cursor = await conn.execute(
+        "SELECT id, api_key FROM agent_instances WHERE api_key_hash IS NOT NULL AND api_key NOT LIKE '%…'"
+    )
+    rows = await cursor.fetchall()
+    if rows:
+        await conn.executemany(
+            "UPDATE agent_instances SET api_key = ? WHERE id = ?",
+            [(api_key_hint(row["api_key"]), row["id"]) for row in rows],
+        )
+        await conn.commit()
+
+
+async def _init_read_pool(db_path: Path) -> None:
+    """읽기 전용 연결 풀 생성 (query_only로 실수에 의한 쓰기 차단)"""
+    global _read_pool
+
+    _read_pool = asyncio.Queue()
+    for _ in range(READ_POOL_SIZE):
+        conn = await aiosqlite.connect(db_path)
+        await configure_connection(conn)
+        await conn.execute("PRAGMA query_only = ON")
+        _read_connections.append(conn)
+        _read_pool.put_nowait(conn)
+
+
 async def close_database() -> None:
     """데이터베이스 연결 종료"""
-    global _db_connection
+    global _db_connection, _read_pool
+
+    _read_pool = None
+    for conn in _read_connections:
+        await conn.close()
+    _read_connections.clear()
 
     if _db_connection:
         await _db_connection.close()
@@ -942,13 +1120,37 @@ async def get_db() -> AsyncGenerator[aiosqlite.Connection, None]:
     yield _db_connection
 
 
+@asynccontextmanager
+async def read_connection(fallback: aiosqlite.Connection) -> AsyncIterator[aiosqlite.Connection]:
+    """읽기 전용 연결을 쿼리 한 번 동안만 대여
+
+    요청 전체가 아니라 execute/fetch 구간에만 빌려 LLM 대기 등으로 풀이 고갈되지 않게 한다.
+    풀이 없거나(초기화 전/테스트) 모두 사용 중이면 기다리지 않고 fallback 연결을 쓴다.
+    커밋된 데이터만 보이므로 커밋 전 쓰기를 읽는 용도로는 쓰지 않는다.
+    """
+    pool = _read_pool
+    if pool is None:
+        yield fallback
+        return
+    try:
+        conn = pool.get_nowait()
+    except asyncio.QueueEmpty:
+        yield fallback
+        return
+    try:
+        yield conn
+    finally:
+        # 대여 중 풀이 닫혔으면(종료) 반납하지 않음
+        if _read_pool is pool:
+            pool.put_nowait(conn)
+
+
 async def get_db_sync() -> aiosqlite.Connection:
     """데이터베이스 연결 반환 (WebSocket용)"""
     settings = get_settings()
     db_path = Path(settings.sqlite_db_path)
     
     conn = await aiosqlite.connect(db_path)
-    conn.row_factory = aiosqlite.Row
-    await conn.execute("PRAGMA foreign_keys = ON")
-    
+    await configure_connection(conn)
+
     return conn
@@ -0,0 +1,94 @@
+"""임베딩 영구 캐시 (SQLite embedding_cache 테이블)
+
+같은 텍스트를 같은 provider/모델로 다시 임베딩하지 않도록 벡터를 저장한다.
+벡터는 float32 배열 BLOB으로 저장한다.
+
+테이블은 EMBEDDING_CACHE_MAX_ROWS 행 이하로 유지한다. 저장 PRUNE_INTERVAL회마다
+가장 오래 전에 저장된 행부터 지우고, 기동 시에는 현재 설정되지 않은 모델의 행을 지운다.
+"""
+
+import hashlib
+from array import array
+from typing import Any
+
+import aiosqlite
+
+EMBEDDING_CACHE_MAX_ROWS = 50_000
+PRUNE_INTERVAL = 500
+
+_stores_since_prune = 0
+
+
+def provider_key(provider: Any) -> tuple[str, str]:
+    """캐시 키용 (provider 이름, 모델명)"""
+    model = getattr(provider, "model", None) or getattr(provider, "model_url", "")
+    return type(provider).__name__, model
+
+
+def content_hash(text: str) -> str:
+    """캐시 키용 텍스트 해시"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def get_cached_embedding(
+    db: aiosqlite.Connection,
+    provider: str,
+    model: str,
+    text: str,
+) -> list[float] | None:
+    """저장된 임베딩 조회 (없으면 None)"""
+    cursor = await db.execute(
+        """SELECT vector FROM embedding_cache
+           WHERE content_hash = ? AND provider = ? AND model = ?""",
+        (content_hash(text), provider, model),
+    )
+    row = await cursor.fetchone()
+    if not row:
+        return None
+    return array("f", row[0]).tolist()
+
+
+async def store_embedding(
+    db: aiosqlite.Connection,
+    provider: str,
+    model: str,
+    text: str,
+    vector: list[float],
+) -> None:
+    """임베딩 저장 (커밋은 호출자가 수행)"""
+    global _stores_since_prune
+
+    await db.execute(
+        """INSERT OR REPLACE INTO embedding_cache (content_hash, provider, model, vector)
+           VALUES (?, ?, ?, ?)""",
+        (content_hash(text), provider, model, array("f", vector).tobytes()),
+    )
+    _stores_since_prune += 1
+    if _stores_since_prune >= PRUNE_INTERVAL:
+        _stores_since_prune = 0
+        await prune_embedding_cache(db)
+
+
+async def prune_embedding_cache(
+    db: aiosqlite.Connection,
+    keep: tuple[str, str] | None = None,
+) -> int:
+    """캐시 정리 (커밋은 호출자가 수행) — 삭제한 행 수 반환
+
+    keep=(provider, model)을 주면 그 외 모델의 행을 지우고,
+    최근 저장(rowid 역순) EMBEDDING_CACHE_MAX_ROWS 행만 남긴다.
+    """
+    deleted = 0
+    if keep is not None:
+        cursor = await db.execute(
+            "DELETE FROM embedding_cache WHERE NOT (provider = ? AND model = ?)", keep,
+        )
+        deleted += cursor.rowcount
+    cursor = await db.execute(
+        """DELETE FROM embedding_cache WHERE rowid <= (
+               SELECT rowid FROM embedding_cache ORDER BY rowid DESC LIMIT 1 OFFSET ?
+           )""",
+        (EMBEDDING_CACHE_MAX_ROWS,),
+    )
+    deleted += cursor.rowcount
+    return deleted
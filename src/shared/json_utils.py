@@ -0,0 +1,30 @@
+"""JSON 직렬화 유틸리티
+
+메타데이터/설정 컬럼 직렬화에 사용한다. orjson이 설치되어 있으면 orjson을,
+없으면 표준 json 모듈을 사용한다. 두 경로 모두 str을 반환한다.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 미설치 환경
+    orjson = None
+
+# orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj: Any) -> str:
+    """객체를 JSON 문자열로 직렬화"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: str | bytes) -> Any:
+    """JSON 문자열을 객체로 역직렬화"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -12,6 +12,19 @@ _qdrant_client: AsyncQdrantClient | None = None
 _qdrant_available: bool = False
 
 
+def _quantization_config() -> models.ScalarQuantization | None:
+    """int8 스칼라 양자화 설정 (비활성화 시 None → FP32 원본 벡터로 검색)"""
+    if not get_settings().qdrant_scalar_quantization:
+        return None
+    return models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            quantile=0.99,
+            always_ram=True,
+        ),
+    )
+
+
 def is_vector_store_available() -> bool:
     """Qdrant 사용 가능 여부 반환"""
     return _qdrant_available
@@ -57,6 +70,17 @@ async def init_vector_store() -> None:
                 except Exception:
                     pass  # 이미 존재하면 무시
 
+            # 기존 Collection에 int8 양자화 적용 시도
+            quantization_config = _quantization_config()
+            if quantization_config:
+                try:
+                    await _qdrant_client.update_collection(
+                        collection_name=settings.qdrant_collection,
+                        quantization_config=quantization_config,
+                    )
+                except Exception as e:
+                    print(f"⚠️  Qdrant 양자화 설정 실패 (FP32로 검색): {e}")
+
         except UnexpectedResponse:
             # Collection 생성
             await _qdrant_client.create_collection(
@@ -65,6 +89,7 @@ async def init_vector_store() -> None:
                     size=settings.embedding_dimension,
                     distance=models.Distance.COSINE,
                 ),
+                quantization_config=_quantization_config(),
             )
 
             # 인덱스 생성 (payload 필드)
@@ -153,8 +178,37 @@ async def upsert_vector(
     )
 
 
-def _build_condition(cond: dict) -> models.FieldCondition:
-    """딕셔너리 조건을 Qdrant FieldCondition으로 변환"""
+# 일괄 저장 요청당 포인트 수 (큰 문서도 Qdrant 요청 크기 제한을 넘지 않도록 분할)
+UPSERT_BATCH_SIZE = 256
+
+
+async def upsert_vectors(points: list[tuple[str, list[float], dict[str, Any]]]) -> None:
+    """벡터 일괄 저장/업데이트 — (vector_id, vector, payload) 목록을 UPSERT_BATCH_SIZE개씩 요청"""
+    if not points:
+        return
+    client = get_vector_store()
+    if client is None:
+        print("⚠️  Qdrant 미연결: 벡터 저장 건너뜀")
+        return
+
+    settings = get_settings()
+    for start in range(0, len(points), UPSERT_BATCH_SIZE):
+        await client.upsert(
+            collection_name=settings.qdrant_collection,
+            points=[
+                models.PointStruct(id=vector_id, vector=vector, payload=payload)
+                for vector_id, vector, payload in points[start:start + UPSERT_BATCH_SIZE]
+            ],
+        )
+
+
+def _build_condition(cond: dict) -> models.FieldCondition | models.Filter:
+    """딕셔너리 조건을 Qdrant FieldCondition으로 변환
+
+    "key" 없이 should/must/must_not을 가진 딕셔너리는 중첩 Filter(조건 그룹)로 변환한다.
+    """
+    if "key" not in cond:
+        return _build_advanced_filter(cond)
     key = cond["key"]
     match = cond["match"]
     if "any" in match:
@@ -163,17 +217,20 @@ def _build_condition(cond: dict) -> models.FieldCondition:
 
 
 def _build_advanced_filter(filter_conditions: dict[str, Any]) -> models.Filter | None:
-    """should/must 키를 포함한 고급 필터 구성"""
+    """should/must/must_not 키를 포함한 고급 필터 구성"""
     should = None
     must = None
+    must_not = None
 
     if "should" in filter_conditions:
         should = [_build_condition(c) for c in filter_conditions["should"]]
     if "must" in filter_conditions:
         must = [_build_condition(c) for c in filter_conditions["must"]]
+    if "must_not" in filter_conditions:
+        must_not = [_build_condition(c) for c in filter_conditions["must_not"]]
 
-    if should or must:
-        return models.Filter(should=should, must=must)
+    if should or must or must_not:
+        return models.Filter(should=should, must=must, must_not=must_not)
     return None
 
 
@@ -194,8 +251,8 @@ async def search_vectors(
     # 필터 조건 구성
     query_filter = None
     if filter_conditions:
-        # "should"/"must" 키가 있으면 고급 필터 모드
-        if "should" in filter_conditions or "must" in filter_conditions:
+        # "should"/"must"/"must_not" 키가 있으면 고급 필터 모드
+        if any(k in filter_conditions for k in ("should", "must", "must_not")):
             query_filter = _build_advanced_filter(filter_conditions)
         else:
             # 기존 단순 key-value 필터
@@ -219,6 +276,13 @@ async def search_vectors(
             if must_conditions:
                 query_filter = models.Filter(must=must_conditions)
 
+    # 양자화된 int8 벡터로 후보를 찾고 원본 벡터로 재채점 (양자화 미적용 시 무시됨)
+    search_params = None
+    if settings.qdrant_scalar_quantization:
+        search_params = models.SearchParams(
+            quantization=models.QuantizationSearchParams(rescore=True),
+        )
+
     # query_points 사용 (최신 qdrant-client API)
     results = await client.query_points(
         collection_name=settings.qdrant_collection,
@@ -226,6 +290,7 @@ async def search_vectors(
         limit=limit,
         score_threshold=score_threshold,
         query_filter=query_filter,
+        search_params=search_params,
     )
 
     return [
@@ -46,14 +46,19 @@ class UserRepository:
         name: str,
         email: str,
         department_id: str | None = None,
+        password_hash: str | None = None,
+        sso_provider: str | None = None,
+        sso_id: str | None = None,
     ) -> dict[str, Any]:
-        """사용자 생성"""
+        """사용자 생성 (비밀번호 해시/SSO 정보도 같은 INSERT로 저장)"""
         user_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
         await self.db.execute(
-            """INSERT INTO users (id, name, email, department_id, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (user_id, name, email, department_id, now, now),
+            """INSERT INTO users (id, name, email, department_id, password_hash,
+                                  sso_provider, sso_id, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (user_id, name, email, department_id, password_hash,
+             sso_provider, sso_id, now, now),
         )
         await self.db.commit()
         return await self.get_user(user_id)
@@ -119,6 +119,7 @@ def mock_embedding_provider():
     provider.embed = AsyncMock(return_value=[0.1] * 1024)
     provider.embed_batch = AsyncMock(return_value=[[0.1] * 1024])
     provider.dimension = 1024
+    provider.model = "test-embedding"
     return provider
 
 
@@ -0,0 +1,483 @@
+"""AgentService 테스트"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.agent import service as agent_service
+from src.agent.repository import AgentRepository
+from src.shared.auth import api_key_hint, hash_api_key
+from src.shared.embedding_cache import provider_key
+from src.shared.exceptions import PermissionDeniedException
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    agent_service._embedding_cache.clear()
+    agent_service._api_key_cache.clear()
+    yield
+    agent_service._embedding_cache.clear()
+    agent_service._api_key_cache.clear()
+
+
+class TestEmbedCached:
+    async def test_cache_hit_skips_provider(self, mock_embedding_provider):
+        mock_embedding_provider.model = "test-model"
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider):
+            first = await agent_service._embed_cached("같은 쿼리")
+            second = await agent_service._embed_cached("같은 쿼리")
+            assert first == second
+            mock_embedding_provider.embed.assert_awaited_once()
+
+    async def test_model_change_misses(self, mock_embedding_provider):
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider):
+            mock_embedding_provider.model = "model-a"
+            await agent_service._embed_cached("쿼리")
+            mock_embedding_provider.model = "model-b"
+            await agent_service._embed_cached("쿼리")
+            assert mock_embedding_provider.embed.await_count == 2
+
+    async def test_same_model_other_provider_misses(self, mock_embedding_provider):
+        class ProxyProvider:
+            model = "test-embedding"
+            embed = AsyncMock(return_value=[0.2] * 1024)
+
+        proxy = ProxyProvider()
+        first = await agent_service._embed_cached("쿼리", provider=mock_embedding_provider)
+        second = await agent_service._embed_cached("쿼리", provider=proxy)
+
+        assert first != second
+        proxy.embed.assert_awaited_once()
+
+    async def test_evicts_oldest(self, mock_embedding_provider):
+        mock_embedding_provider.model = "test-model"
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.EMBEDDING_CACHE_SIZE", 2):
+            await agent_service._embed_cached("a")
+            await agent_service._embed_cached("b")
+            await agent_service._embed_cached("c")
+            assert (*provider_key(mock_embedding_provider), "a") not in agent_service._embedding_cache
+            assert len(agent_service._embedding_cache) == 2
+
+    async def test_persisted_across_process_cache(self, db, mock_embedding_provider):
+        mock_embedding_provider.model = "test-model"
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider):
+            await agent_service._embed_cached("저장될 텍스트", db)
+            agent_service._embedding_cache.clear()
+            vector = await agent_service._embed_cached("저장될 텍스트", db)
+
+        mock_embedding_provider.embed.assert_awaited_once()
+        assert vector == pytest.approx([0.1] * 1024)
+
+
+@pytest.fixture
+def agent_svc(db):
+    svc = agent_service.AgentService(db)
+    instance = {"id": "inst-1", "name": "테스트 에이전트", "owner_id": "user-1", "status": "active"}
+    svc._resolve_user_from_api_key = AsyncMock(return_value=(instance, "user-1"))
+    return svc
+
+
+async def _seed_room_memories(db):
+    for mem_id, content, superseded in [
+        ("mem-a", "최신 결정 사항", 0),
+        ("mem-b", "대체된 결정 사항", 1),
+    ]:
+        await db.execute(
+            """INSERT INTO memories (id, content, scope, owner_id, chat_room_id, superseded, created_at)
+               VALUES (?, ?, 'chatroom', 'user-1', 'room-1', ?, datetime('now'))""",
+            (mem_id, content, superseded),
+        )
+    await db.commit()
+
+
+class TestSearchMemories:
+    async def test_sources_combined_into_one_search(
+        self, db, seed_chat_room, agent_svc, mock_embedding_provider,
+    ):
+        await _seed_room_memories(db)
+        hits = [
+            {"id": "v-a", "score": 0.9, "payload": {"memory_id": "mem-a", "scope": "chatroom"}},
+            {"id": "v-b", "score": 0.8, "payload": {"memory_id": "mem-b", "scope": "chatroom"}},
+        ]
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.search_vectors", new_callable=AsyncMock, return_value=hits) as mock_search:
+            result = await agent_svc.search_memories(
+                api_key="key",
+                query="결정",
+                context_sources={"chat_rooms": ["room-1", "room-unknown"], "include_agent": True},
+            )
+
+        mock_search.assert_awaited_once()
+        should = mock_search.await_args.kwargs["filter_conditions"]["should"]
+        # 접근 불가 대화방은 필터에서 제외: room-1 + agent
+        assert len(should) == 2
+        assert should[0]["must"][0]["match"] == {"any": ["room-1"]}
+        # superseded 메모리는 제외
+        assert [r["memory_id"] for r in result["results"]] == ["mem-a"]
+        # API Key 해석은 요청당 한 번
+        agent_svc._resolve_user_from_api_key.assert_awaited_once()
+
+    async def test_vector_store_failure_returns_empty(
+        self, db, seed_chat_room, agent_svc, mock_embedding_provider,
+    ):
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.search_vectors", new_callable=AsyncMock) as mock_search:
+            mock_search.side_effect = RuntimeError("qdrant down")
+            result = await agent_svc.search_memories(
+                api_key="key",
+                query="결정",
+                context_sources={"chat_rooms": ["room-1"]},
+            )
+
+        assert result["total"] == 0
+
+    async def test_no_sources_skips_search(self, db, seed_users, agent_svc, mock_embedding_provider):
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.search_vectors", new_callable=AsyncMock) as mock_search:
+            result = await agent_svc.search_memories(api_key="key", query="결정")
+
+        mock_search.assert_not_awaited()
+        assert result["total"] == 0
+
+    async def test_document_chunks_fetched_in_batch(
+        self, db, seed_users, agent_svc, mock_embedding_provider,
+    ):
+        await db.execute(
+            """INSERT INTO documents (id, name, file_type, file_size, owner_id, status)
+               VALUES ('doc-1', '가이드.txt', 'txt', 10, 'user-1', 'completed')"""
+        )
+        for idx in range(3):
+            await db.execute(
+                """INSERT INTO document_chunks (id, document_id, content, chunk_index)
+                   VALUES (?, 'doc-1', ?, ?)""",
+                (f"chunk-{idx}", f"청크 {idx}", idx),
+            )
+        await db.commit()
+        hits = [
+            {"id": "v-0", "score": 0.9, "payload": {"document_id": "doc-1", "chunk_index": 2, "scope": "document"}},
+            {"id": "v-1", "score": 0.7, "payload": {"document_id": "doc-1", "chunk_index": 0, "scope": "document"}},
+            {"id": "v-2", "score": 0.5, "payload": {"document_id": "doc-1", "chunk_index": 9, "scope": "document"}},
+        ]
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.search_vectors", new_callable=AsyncMock, return_value=hits):
+            result = await agent_svc.search_memories(
+                api_key="key",
+                query="가이드",
+                context_sources={"include_document": True},
+            )
+
+        assert [r["content"] for r in result["results"]] == ["청크 2", "청크 0"]
+
+    async def test_duplicate_hits_keep_best_score(
+        self, db, seed_chat_room, agent_svc, mock_embedding_provider,
+    ):
+        await _seed_room_memories(db)
+        hits = [
+            {"id": "v-a", "score": 0.9, "payload": {"memory_id": "mem-a", "scope": "chatroom"}},
+            {"id": "v-a2", "score": 0.3, "payload": {"memory_id": "mem-a", "scope": "chatroom"}},
+        ]
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.search_vectors", new_callable=AsyncMock, return_value=hits):
+            result = await agent_svc.search_memories(
+                api_key="key",
+                query="결정",
+                context_sources={"chat_rooms": ["room-1"]},
+                limit=5,
+            )
+
+        assert result["total"] == 1
+        assert result["results"][0]["score"] > 0.9 * 0.6
+
+
+@pytest.fixture
+async def seed_agent_types(db, seed_users):
+    """user-1(dept-1) 개발 Agent Type: 공개 범위별 1개씩"""
+    await db.execute("INSERT INTO projects (id, name) VALUES ('proj-1', '프로젝트1')")
+    await db.execute("INSERT INTO projects (id, name) VALUES ('proj-2', '프로젝트2')")
+    for pm_id, project_id, user_id in [
+        ("pm-1", "proj-1", "user-1"),
+        ("pm-2", "proj-1", "user-3"),
+        ("pm-3", "proj-2", "user-1"),
+    ]:
+        await db.execute(
+            "INSERT INTO project_members (id, project_id, user_id) VALUES (?, ?, ?)",
+            (pm_id, project_id, user_id),
+        )
+    for type_id, scope, project_id in [
+        ("type-public", "public", None),
+        ("type-private", "private", None),
+        ("type-dept", "department", None),
+        ("type-proj-1", "project", "proj-1"),
+        ("type-proj-2", "project", "proj-2"),
+        ("type-proj-shared", "project", None),
+    ]:
+        await db.execute(
+            """INSERT INTO agent_types (id, name, developer_id, public_scope, project_id)
+               VALUES (?, ?, 'user-1', ?, ?)""",
+            (type_id, type_id, scope, project_id),
+        )
+    await db.commit()
+
+
+class TestListAgentTypes:
+    async def _visible(self, db, user_id):
+        svc = agent_service.AgentService(db)
+        return {t["id"] for t in await svc.list_agent_types(user_id=user_id)}
+
+    async def test_developer_sees_all(self, db, seed_agent_types):
+        assert len(await self._visible(db, "user-1")) == 6
+
+    async def test_same_department(self, db, seed_agent_types):
+        assert await self._visible(db, "user-2") == {"type-public", "type-dept"}
+
+    async def test_project_member(self, db, seed_agent_types):
+        assert await self._visible(db, "user-3") == {
+            "type-public", "type-proj-1", "type-proj-shared",
+        }
+
+    async def test_limit_applies_after_visibility_filter(self, db, seed_agent_types):
+        svc = agent_service.AgentService(db)
+        types = await svc.list_agent_types(user_id="user-2", limit=2)
+        assert {t["id"] for t in types} == {"type-public", "type-dept"}
+
+
+@pytest.fixture
+async def seed_agent_instance(db, seed_users):
+    await db.execute(
+        "INSERT INTO agent_types (id, name, developer_id) VALUES ('type-1', '테스트', 'user-1')"
+    )
+    await db.execute(
+        """INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, api_key_hash)
+           VALUES ('inst-1', 'type-1', '테스트 에이전트', 'user-1', ?, ?)""",
+        (api_key_hint("key-1"), hash_api_key("key-1")),
+    )
+    await db.commit()
+
+
+class TestResolveApiKey:
+    async def test_cached_within_ttl(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        with patch.object(
+            svc.repo, "get_agent_instance_by_api_key", wraps=svc.repo.get_agent_instance_by_api_key,
+        ) as lookup:
+            await svc._resolve_user_from_api_key("key-1")
+            instance, user_id = await svc._resolve_user_from_api_key("key-1")
+            assert instance["id"] == "inst-1"
+            assert user_id == "user-1"
+            assert lookup.await_count == 1
+
+    async def test_invalidated_on_update(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        await svc._resolve_user_from_api_key("key-1")
+        await svc.update_agent_instance("inst-1", "user-1", status="inactive")
+
+        with pytest.raises(PermissionDeniedException):
+            await svc._resolve_user_from_api_key("key-1")
+
+    async def test_resolve_during_write_does_not_survive(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        update = svc.repo.update_agent_instance
+
+        async def update_with_concurrent_resolve(*args, **kwargs):
+            # 쓰기 도중 다른 요청이 이전 행을 캐시에 다시 넣는 상황
+            await svc._resolve_user_from_api_key("key-1")
+            return await update(*args, **kwargs)
+
+        with patch.object(svc.repo, "update_agent_instance", update_with_concurrent_resolve):
+            await svc.update_agent_instance("inst-1", "user-1", status="inactive")
+
+        with pytest.raises(PermissionDeniedException):
+            await svc._resolve_user_from_api_key("key-1")
+
+    async def test_invalidated_on_regenerate(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        await svc._resolve_user_from_api_key("key-1")
+        await svc.regenerate_api_key("inst-1", "user-1")
+
+        with pytest.raises(PermissionDeniedException):
+            await svc._resolve_user_from_api_key("key-1")
+
+    async def test_non_owner_update_denied_without_share_lookup(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        with patch.object(svc.repo, "list_agent_instance_shares", AsyncMock()) as list_shares:
+            with pytest.raises(PermissionDeniedException):
+                await svc.update_agent_instance("inst-1", "user-2", status="inactive")
+        list_shares.assert_not_awaited()
+
+    async def test_created_key_not_stored_in_plaintext(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        instance = await svc.create_agent_instance("type-1", "새 에이전트", "user-1")
+
+        cursor = await db.execute(
+            "SELECT api_key, api_key_hash FROM agent_instances WHERE id = ?", (instance["id"],),
+        )
+        row = await cursor.fetchone()
+        assert row["api_key"] != instance["api_key"]
+        assert row["api_key"] == api_key_hint(instance["api_key"])
+        assert row["api_key_hash"] == hash_api_key(instance["api_key"])
+        resolved, _ = await svc._resolve_user_from_api_key(instance["api_key"])
+        assert resolved["id"] == instance["id"]
+
+    async def test_regenerated_key_not_stored_in_plaintext(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        new_key = await svc.regenerate_api_key("inst-1", "user-1")
+
+        cursor = await db.execute("SELECT api_key FROM agent_instances WHERE id = 'inst-1'")
+        assert (await cursor.fetchone())["api_key"] == api_key_hint(new_key)
+
+    async def test_regenerated_key_resolves_by_hash(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        new_key = await svc.regenerate_api_key("inst-1", "user-1")
+
+        with patch.object(svc.db, "execute", wraps=svc.db.execute) as execute:
+            instance, _ = await svc._resolve_user_from_api_key(new_key)
+        assert instance["id"] == "inst-1"
+        assert all("api_key = ?" not in call.args[0] for call in execute.call_args_list)
+
+    async def test_cache_does_not_hold_plaintext_key(self, db, seed_agent_instance):
+        svc = agent_service.AgentService(db)
+        instance, _ = await svc._resolve_user_from_api_key("key-1")
+
+        assert all(key != "key-1" for key, _ in agent_service._api_key_cache)
+        for _, (cached_instance, _) in agent_service._api_key_cache.values():
+            assert "api_key" not in cached_instance
+            assert "key-1" not in cached_instance.values()
+        assert "api_key" not in instance
+
+
+class TestConvertToMemory:
+    async def test_memory_and_vector_share_ids(self, db, seed_users, mock_embedding_provider):
+        svc = agent_service.AgentService(db)
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.upsert_vector", new_callable=AsyncMock) as mock_upsert:
+            memory = await svc._convert_to_memory("에이전트 메모", "user-1", "inst-1")
+
+        kwargs = mock_upsert.await_args.kwargs
+        assert kwargs["vector_id"] == memory["vector_id"]
+        assert kwargs["payload"]["memory_id"] == memory["id"]
+        assert memory["metadata"]["agent_instance_id"] == "inst-1"
+
+    async def test_uses_injected_embedder(self, db, seed_users, mock_embedding_provider):
+        svc = agent_service.AgentService(db, embedder=mock_embedding_provider)
+        with patch("src.agent.service.get_embedding_provider") as mock_factory, \
+             patch("src.agent.service.upsert_vector", new_callable=AsyncMock):
+            await svc._convert_to_memory("주입된 임베더로 변환", "user-1", "inst-1")
+
+        mock_factory.assert_not_called()
+        mock_embedding_provider.embed.assert_awaited_once()
+
+    async def test_db_failure_removes_vector(self, db, mock_embedding_provider):
+        svc = agent_service.AgentService(db)
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.upsert_vector", new_callable=AsyncMock), \
+             patch("src.agent.service.delete_vector", new_callable=AsyncMock) as mock_delete, \
+             patch.object(svc.memory_repo, "create_memory", AsyncMock(side_effect=RuntimeError("db"))):
+            with pytest.raises(RuntimeError):
+                await svc._convert_to_memory("에이전트 메모", "user-1", "inst-1")
+
+        mock_delete.assert_awaited_once()
+
+
+class TestReceiveAgentData:
+    async def test_memory_data_stored_with_single_ingest_commit(
+        self, db, seed_agent_instance, mock_embedding_provider,
+    ):
+        svc = agent_service.AgentService(db)
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.upsert_vector", new_callable=AsyncMock), \
+             patch.object(svc.repo, "create_agent_data", wraps=svc.repo.create_agent_data) as create_data:
+            data = await svc.receive_agent_data("key-1", "memory", "에이전트 메모")
+
+        assert create_data.await_args.kwargs["commit"] is False
+        cursor = await db.execute("SELECT COUNT(*) FROM memories WHERE scope = 'agent'")
+        assert (await cursor.fetchone())[0] == 1
+        assert (await svc.repo.get_agent_data(data["id"]))["content"] == "에이전트 메모"
+
+    async def test_agent_data_kept_when_memory_conversion_fails(
+        self, db, seed_agent_instance, mock_embedding_provider,
+    ):
+        svc = agent_service.AgentService(db)
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.upsert_vector", AsyncMock(side_effect=RuntimeError("qdrant"))), \
+             patch("src.agent.service.delete_vector", new_callable=AsyncMock):
+            with pytest.raises(RuntimeError):
+                await svc.receive_agent_data("key-1", "memory", "에이전트 메모")
+
+        assert not db.in_transaction
+        cursor = await db.execute("SELECT COUNT(*) FROM agent_data")
+        assert (await cursor.fetchone())[0] == 1
+
+    async def test_agent_data_kept_when_embedding_fails(
+        self, db, seed_agent_instance, mock_embedding_provider,
+    ):
+        mock_embedding_provider.embed = AsyncMock(side_effect=RuntimeError("embedding"))
+        svc = agent_service.AgentService(db, embedder=mock_embedding_provider)
+        with pytest.raises(RuntimeError):
+            await svc.receive_agent_data("key-1", "memory", "에이전트 메모")
+
+        assert not db.in_transaction
+        cursor = await db.execute("SELECT content FROM agent_data")
+        assert [row["content"] for row in await cursor.fetchall()] == ["에이전트 메모"]
+
+
+class TestReceiveAgentDataBulk:
+    async def test_webhook_events_stored_in_one_batch(
+        self, db, seed_agent_instance, mock_embedding_provider,
+    ):
+        svc = agent_service.AgentService(db, embedder=mock_embedding_provider)
+        items = [{"data_type": "message", "content": f"메시지 {i}"} for i in range(5)]
+        with patch.object(AgentRepository, "get_agent_instance", AsyncMock()) as get_instance, \
+             patch.object(
+                 AgentRepository, "create_webhook_events",
+                 autospec=True, side_effect=AgentRepository.create_webhook_events,
+             ) as create_events:
+            await svc.receive_agent_data_bulk("key-1", items)
+
+        get_instance.assert_not_awaited()
+        create_events.assert_awaited_once()
+        cursor = await db.execute("SELECT COUNT(*) FROM webhook_events")
+        assert (await cursor.fetchone())[0] == 5
+
+    async def test_agent_data_kept_when_embedding_fails(
+        self, db, seed_agent_instance, mock_embedding_provider,
+    ):
+        mock_embedding_provider.embed_batch = AsyncMock(side_effect=RuntimeError("embedding"))
+        svc = agent_service.AgentService(db, embedder=mock_embedding_provider)
+        items = [{"data_type": "memory", "content": "메모 1"}, {"data_type": "log", "content": "로그"}]
+        with pytest.raises(RuntimeError):
+            await svc.receive_agent_data_bulk("key-1", items)
+
+        assert not db.in_transaction
+        cursor = await db.execute("SELECT COUNT(*) FROM agent_data")
+        assert (await cursor.fetchone())[0] == 2
+
+    async def test_embeds_once_and_keeps_order(self, db, seed_agent_instance, mock_embedding_provider):
+        mock_embedding_provider.embed_batch = AsyncMock(return_value=[[0.1] * 1024, [0.2] * 1024])
+        svc = agent_service.AgentService(db)
+        items = [
+            {"data_type": "memory", "content": "메모 1"},
+            {"data_type": "log", "content": "로그"},
+            {"data_type": "memory", "content": "메모 2"},
+        ]
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.upsert_vectors", new_callable=AsyncMock) as mock_upsert:
+            results = await svc.receive_agent_data_bulk("key-1", items)
+
+        assert [r["content"] for r in results] == ["메모 1", "로그", "메모 2"]
+        mock_embedding_provider.embed_batch.assert_awaited_once_with(["메모 1", "메모 2"])
+        mock_embedding_provider.embed.assert_not_awaited()
+        points = mock_upsert.await_args.args[0]
+        assert len(points) == 2
+
+        memories = await svc.memory_repo.get_memories_by_ids([p[2]["memory_id"] for p in points])
+        assert {m["content"] for m in memories} == {"메모 1", "메모 2"}
+        assert all(m["vector_id"] in {p[0] for p in points} for m in memories)
+
+    async def test_cached_texts_skip_batch_embedding(self, db, seed_agent_instance, mock_embedding_provider):
+        agent_service._embedding_cache[(*provider_key(mock_embedding_provider), "메모 1")] = [0.3] * 1024
+        svc = agent_service.AgentService(db)
+        with patch("src.agent.service.get_embedding_provider", return_value=mock_embedding_provider), \
+             patch("src.agent.service.upsert_vectors", new_callable=AsyncMock):
+            await svc.receive_agent_data_bulk("key-1", [{"data_type": "memory", "content": "메모 1"}])
+
+        mock_embedding_provider.embed_batch.assert_not_awaited()
@@ -1,14 +1,19 @@
 """Auth 모듈 테스트"""
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
+import pytest
+
+from src.auth import service as auth_service
+from src.auth.service import AuthService
 from src.shared.auth import (
     create_access_token,
     verify_access_token,
     hash_password,
     verify_password,
 )
+from src.shared.exceptions import ForbiddenException
 
 
 def _mock_settings():
@@ -52,6 +57,26 @@ class TestAccessToken:
     def test_empty_token(self, _):
         assert verify_access_token("") is None
 
+    @patch("src.shared.auth.get_settings", return_value=_mock_settings())
+    def test_cached_token_still_expires(self, _):
+        token = create_access_token("user-1", expires_delta=timedelta(hours=1))
+        assert verify_access_token(token) == "user-1"
+
+        later = datetime.utcnow() + timedelta(hours=2)
+        with patch("src.shared.auth.datetime") as mock_dt:
+            mock_dt.utcnow.return_value = later
+            assert verify_access_token(token) is None
+
+    def test_secret_change_invalidates_cached_token(self):
+        with patch("src.shared.auth.get_settings", return_value=_mock_settings()):
+            token = create_access_token("user-1")
+            assert verify_access_token(token) == "user-1"
+
+        rotated = _mock_settings()
+        rotated.jwt_secret_key = "rotated-secret"
+        with patch("src.shared.auth.get_settings", return_value=rotated):
+            assert verify_access_token(token) is None
+
 
 class TestPassword:
     """비밀번호 해싱/검증 테스트"""
@@ -73,3 +98,77 @@ class TestPassword:
 
     def test_verify_malformed_hash(self):
         assert verify_password("test", "no-dollar-sign") is False
+
+
+class TestAuthServiceLogin:
+    """AuthService 로그인 (비밀번호 검증은 스레드에서 수행)"""
+
+    async def test_register_then_login(self, db):
+        svc = AuthService(db)
+        await svc.register(name="신규", email="new@test.com", password="pw-1234")
+
+        result = await svc.login("new@test.com", "pw-1234")
+        assert result["user"]["email"] == "new@test.com"
+
+    async def test_wrong_password(self, db):
+        svc = AuthService(db)
+        await svc.register(name="신규", email="new@test.com", password="pw-1234")
+
+        with pytest.raises(ForbiddenException):
+            await svc.login("new@test.com", "wrong")
+
+    async def test_unknown_email_still_verifies(self, db):
+        svc = AuthService(db)
+        with patch("src.auth.service.verify_password", return_value=False) as mock_verify:
+            with pytest.raises(ForbiddenException):
+                await svc.login("nobody@test.com", "pw-1234")
+
+        mock_verify.assert_called_once()
+
+    async def test_register_stores_hash_on_insert(self, db):
+        svc = AuthService(db)
+        result = await svc.register(name="신규", email="new@test.com", password="pw-1234")
+
+        user = await svc.user_repo.get_user(result["user"]["id"])
+        assert verify_password("pw-1234", user["password_hash"])
+
+
+class TestAuthServiceCurrentUser:
+    @pytest.fixture(autouse=True)
+    def clear_user_cache(self):
+        auth_service._user_cache.clear()
+        yield
+        auth_service._user_cache.clear()
+
+    async def test_repeated_calls_hit_cache(self, db, seed_users):
+        svc = AuthService(db)
+        with patch("src.shared.auth.get_settings", return_value=_mock_settings()):
+            token = create_access_token("user-1")
+            with patch.object(svc.user_repo, "get_user", wraps=svc.user_repo.get_user) as mock_get:
+                first = await svc.get_current_user(token)
+                second = await svc.get_current_user(token)
+
+        assert first == second
+        assert mock_get.await_count == 1
+
+    async def test_expired_entry_reloads(self, db, seed_users):
+        svc = AuthService(db)
+        with patch("src.shared.auth.get_settings", return_value=_mock_settings()), \
+             patch("src.auth.service.USER_CACHE_TTL_SEC", 0.0):
+            token = create_access_token("user-1")
+            with patch.object(svc.user_repo, "get_user", wraps=svc.user_repo.get_user) as mock_get:
+                await svc.get_current_user(token)
+                await svc.get_current_user(token)
+
+        assert mock_get.await_count == 2
+
+
+class TestAuthServiceSSO:
+    async def test_new_user_created_with_sso_metadata(self, db):
+        svc = AuthService(db)
+        result = await svc.sso_login(
+            email="sso@test.com", name="SSO", sso_provider="okta", sso_id="sso-1",
+        )
+
+        user = await svc.user_repo.get_user(result["user"]["id"])
+        assert (user["sso_provider"], user["sso_id"]) == ("okta", "sso-1")
@@ -43,6 +43,17 @@ class TestChatRoomCRUD:
         assert await repo.delete_chat_room("room-1") is True
         assert await repo.get_chat_room("room-1") is None
 
+    async def test_delete_room_cascades(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        await repo.create_message("room-1", "user-1", "삭제될 메시지")
+        await repo.delete_chat_room("room-1")
+
+        for table in ("chat_messages", "chat_room_members"):
+            cursor = await db.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE chat_room_id = 'room-1'"
+            )
+            assert (await cursor.fetchone())[0] == 0
+
 
 class TestChatMessages:
     async def test_create_message(self, db, seed_chat_room):
@@ -56,6 +67,18 @@ class TestChatMessages:
         assert msg["role"] == "user"
         assert msg["chat_room_id"] == "room-1"
 
+    async def test_create_message_returns_json_fields(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        msg = await repo.create_message(
+            "room-1", "user-1", "@ai 질문", mentions=["ai"], sources={"memories": []},
+        )
+        assert msg["mentions"] == ["ai"]
+        assert msg["sources"] == {"memories": []}
+        assert msg["user_name"] == "관리자"
+
+        stored = await repo.get_message(msg["id"])
+        assert stored["mentions"] == ["ai"]
+
     async def test_list_messages_ordered(self, db, seed_chat_room):
         repo = ChatRepository(db)
         await repo.create_message("room-1", "user-1", "첫번째")
@@ -106,3 +129,178 @@ class TestChatRoomMembers:
         repo = ChatRepository(db)
         members = await repo.list_members("room-1")
         assert len(members) == 2
+
+    async def test_add_member_returns_user_info(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        member = await repo.add_member("room-1", "user-3")
+        assert member["user_id"] == "user-3"
+        assert member["user_name"] is not None
+        assert member["user_email"] is not None
+
+    async def test_update_member_role(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        await repo.add_member("room-1", "user-3")
+        member = await repo.update_member_role("room-1", "user-3", "admin")
+        assert member["role"] == "admin"
+        assert member["user_name"] is not None
+
+
+@pytest.fixture
+async def seed_room_shares(db, seed_chat_room):
+    """room-1을 user-2(멤버)와 user-3(공유 전용)에게 여러 경로로 공유"""
+    await db.execute("INSERT INTO projects (id, name) VALUES ('proj-1', '프로젝트')")
+    await db.execute(
+        "INSERT INTO project_members (id, project_id, user_id) VALUES ('pm-1', 'proj-1', 'user-3')"
+    )
+    shares = [
+        ("share-1", "user", "user-2", "viewer"),
+        ("share-2", "user", "user-3", "viewer"),
+        ("share-3", "project", "proj-1", "member"),
+        ("share-4", "department", "dept-2", "viewer"),
+    ]
+    for share_id, target_type, target_id, role in shares:
+        await db.execute(
+            """INSERT INTO shares (id, resource_type, resource_id, target_type, target_id, role, created_by)
+               VALUES (?, 'chat_room', 'room-1', ?, ?, ?, 'user-1')""",
+            (share_id, target_type, target_id, role),
+        )
+    await db.commit()
+
+
+class TestUserRooms:
+    async def test_membership_wins_over_share(self, db, seed_room_shares):
+        repo = ChatRepository(db)
+        rooms = await repo.get_user_rooms("user-2")
+        assert len(rooms) == 1
+        assert rooms[0]["member_role"] == "member"
+        assert rooms[0]["share_role"] is None
+
+    async def test_highest_share_role_applies(self, db, seed_room_shares):
+        repo = ChatRepository(db)
+        rooms = await repo.get_user_rooms("user-3")
+        assert len(rooms) == 1
+        assert rooms[0]["id"] == "room-1"
+        assert rooms[0]["member_role"] == "member"
+        assert rooms[0]["share_role"] == "member"
+
+    async def test_newest_room_first(self, db, seed_chat_room):
+        await db.execute(
+            """INSERT INTO chat_rooms (id, name, room_type, owner_id, created_at)
+               VALUES ('room-new', '새 방', 'personal', 'user-1', '2999-01-01 00:00:00')"""
+        )
+        await db.execute(
+            "INSERT INTO chat_room_members (id, chat_room_id, user_id, role) VALUES ('m-new', 'room-new', 'user-1', 'owner')"
+        )
+        repo = ChatRepository(db)
+        rooms = await repo.get_user_rooms("user-1")
+        assert [room["id"] for room in rooms] == ["room-new", "room-1"]
+
+    async def test_share_role_prefers_direct_user_share(self, db, seed_room_shares):
+        repo = ChatRepository(db)
+        # user-3: 직접 공유(viewer)가 프로젝트 공유(member)보다 우선
+        assert await repo._get_share_role("room-1", "user-3") == "viewer"
+        assert await repo._get_share_role("room-1", "user-1") is None
+
+
+class TestChatRoomUpdate:
+    async def test_update_context_keeps_name(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        updated = await repo.update_chat_room("room-1", context_sources={"memory": {"personal": True}})
+        assert updated["name"] == "테스트 대화방"
+        assert updated["context_sources"] == {"memory": {"personal": True}}
+
+    async def test_list_rooms_combined_filters(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        assert len(await repo.list_chat_rooms(owner_id="user-1", room_type="personal")) == 1
+        assert await repo.list_chat_rooms(owner_id="user-1", room_type="project") == []
+
+    async def test_context_sources_not_shared_between_reads(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        await repo.update_chat_room("room-1", context_sources={"memory": {"personal": True}})
+        first = await repo.get_chat_room("room-1")
+        first["context_sources"]["memory"]["personal"] = False
+        assert (await repo.get_chat_room("room-1"))["context_sources"] == {"memory": {"personal": True}}
+
+        await repo.update_chat_room("room-1", context_sources={"memory": {"personal": False}})
+        room = await repo.get_chat_room("room-1")
+        assert room["context_sources"] == {"memory": {"personal": False}}
+
+
+class TestMessagePagination:
+    async def test_keyset_continues_after_cursor(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        for i in range(5):
+            await repo.create_message("room-1", "user-1", f"메시지 {i}")
+
+        first_page = await repo.list_messages("room-1", limit=2)
+        last = first_page[-1]
+        second_page = await repo.list_messages("room-1", limit=10, after_id=last["id"])
+
+        contents = [m["content"] for m in first_page + second_page]
+        assert contents == [f"메시지 {i}" for i in range(5)]
+
+    async def test_after_cursor_must_belong_to_room(self, db, seed_chat_room):
+        await db.execute(
+            "INSERT INTO chat_rooms (id, name, room_type, owner_id) VALUES ('room-2', '다른 방', 'personal', 'user-1')"
+        )
+        repo = ChatRepository(db)
+        await repo.create_message("room-1", "user-1", "메시지")
+        other = await repo.create_message("room-2", "user-1", "다른 방 메시지")
+
+        assert await repo.list_messages("room-1", after_id=other["id"]) is None
+        assert await repo.list_messages("room-1", after_id="missing") is None
+        assert await repo.list_messages("room-1", before_id=other["id"]) is None
+        assert await repo.list_messages("room-1", before_id="missing") is None
+
+    async def test_keyset_pages_backwards_before_cursor(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        for i in range(5):
+            await repo.create_message("room-1", "user-1", f"메시지 {i}")
+
+        latest = await repo.get_recent_messages("room-1", limit=2)
+        older = await repo.list_messages("room-1", limit=2, before_id=latest[0]["id"])
+        oldest = await repo.list_messages("room-1", limit=2, before_id=older[0]["id"])
+
+        contents = [m["content"] for m in oldest + older + latest]
+        assert contents == [f"메시지 {i}" for i in range(5)]
+        assert older[0]["user_name"] == "관리자"
+
+
+class TestIsMemberViaShares:
+    async def test_share_precedence_matches_get_member(self, db, seed_room_shares):
+        repo = ChatRepository(db)
+        # 직접 공유(viewer)가 우선 → 멤버 아님
+        assert await repo.is_member("room-1", "user-3") is False
+        assert await repo.get_member("room-1", "user-3") is None
+
+        await db.execute("DELETE FROM shares WHERE id = 'share-2'")
+        # 프로젝트 공유(member) 적용 → 멤버
+        assert await repo.is_member("room-1", "user-3") is True
+        assert await repo.get_member("room-1", "user-3") is not None
+
+
+class TestRoomWithAccess:
+    async def test_member_roles(self, db, seed_room_shares):
+        repo = ChatRepository(db)
+        assert (await repo.get_room_with_access("room-1", "user-1"))["member_role"] == "owner"
+        assert (await repo.get_room_with_access("room-1", "user-2"))["member_role"] == "member"
+
+    async def test_share_role_matches_get_member(self, db, seed_room_shares):
+        repo = ChatRepository(db)
+        room = await repo.get_room_with_access("room-1", "user-3")
+        assert room["name"] == "테스트 대화방"
+        assert room["member_role"] is None
+
+        await db.execute("DELETE FROM shares WHERE id = 'share-2'")
+        assert (await repo.get_room_with_access("room-1", "user-3"))["member_role"] == "member"
+
+    async def test_missing_room(self, db, seed_chat_room):
+        repo = ChatRepository(db)
+        assert await repo.get_room_with_access("missing", "user-1") is None
+
+    async def test_member_role_matches_room_access(self, db, seed_room_shares):
+        repo = ChatRepository(db)
+        for user_id in ("user-1", "user-2", "user-3"):
+            room = await repo.get_room_with_access("room-1", user_id)
+            assert await repo.get_member_role("room-1", user_id) == room["member_role"]
+        assert await repo.get_member_role("missing", "user-1") is None
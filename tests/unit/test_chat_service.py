@@ -0,0 +1,14 @@
+"""ChatService 테스트"""
+
+from src.chat.service import ChatService
+
+
+class TestUpdateChatRoom:
+    async def test_no_op_returns_same_shape_as_update(self, db, seed_chat_room):
+        svc = ChatService(db)
+        unchanged = await svc.update_chat_room("room-1", "user-1")
+        updated = await svc.update_chat_room("room-1", "user-1", name="테스트 대화방")
+
+        assert "member_role" not in unchanged
+        assert unchanged.keys() == updated.keys()
+        assert unchanged == updated
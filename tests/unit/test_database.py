@@ -0,0 +1,93 @@
+"""읽기 연결 대여 테스트"""
+
+import asyncio
+
+import pytest
+
+from src.shared import database
+from src.shared.auth import api_key_hint, hash_api_key
+from src.shared.database import _drop_plaintext_api_keys, read_connection
+
+
+@pytest.fixture
+def read_pool():
+    pool: asyncio.Queue = asyncio.Queue()
+    database._read_pool = pool
+    yield pool
+    database._read_pool = None
+
+
+class TestReadConnection:
+    async def test_without_pool_uses_fallback(self, db):
+        async with read_connection(db) as conn:
+            assert conn is db
+
+    async def test_borrows_and_returns(self, db, read_pool):
+        reader = object()
+        read_pool.put_nowait(reader)
+
+        async with read_connection(db) as conn:
+            assert conn is reader
+            assert read_pool.empty()
+        assert read_pool.get_nowait() is reader
+
+    async def test_exhausted_pool_falls_back_without_waiting(self, db, read_pool):
+        async with read_connection(db) as conn:
+            assert conn is db
+
+
+class TestDropPlaintextApiKeys:
+    @pytest.fixture
+    async def legacy_db(self, db):
+        """평문 api_key(NOT NULL UNIQUE) 스키마의 기존 DB 재현"""
+        await db.execute("PRAGMA foreign_keys = OFF")
+        await db.execute("DROP TABLE agent_instances")
+        await db.execute(
+            """CREATE TABLE agent_instances (
+                id TEXT PRIMARY KEY,
+                agent_type_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                owner_id TEXT NOT NULL,
+                api_key TEXT UNIQUE NOT NULL,
+                config TEXT,
+                webhook_url TEXT,
+                status TEXT DEFAULT 'active',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )"""
+        )
+        await db.execute("ALTER TABLE agent_instances ADD COLUMN api_key_hash BLOB")
+        await db.execute(
+            "INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, api_key_hash) "
+            "VALUES ('inst-1', 'type-1', '에이전트', 'user-1', 'sk_secret', ?)",
+            (hash_api_key("sk_secret"),),
+        )
+        await db.commit()
+        await db.execute("PRAGMA foreign_keys = ON")
+        return db
+
+    async def test_replaces_plaintext_with_hint(self, legacy_db):
+        await _drop_plaintext_api_keys(legacy_db)
+
+        cursor = await legacy_db.execute("SELECT api_key, api_key_hash FROM agent_instances")
+        row = await cursor.fetchone()
+        assert row["api_key"] == api_key_hint("sk_secret")
+        assert row["api_key_hash"] == hash_api_key("sk_secret")
+
+    async def test_relaxes_column_constraint(self, legacy_db):
+        await _drop_plaintext_api_keys(legacy_db)
+
+        cursor = await legacy_db.execute("PRAGMA table_info(agent_instances)")
+        columns = {row["name"]: row for row in await cursor.fetchall()}
+        assert not columns["api_key"]["notnull"]
+        await legacy_db.execute(
+            "INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key) "
+            "VALUES ('inst-2', 'type-1', '에이전트2', 'user-1', NULL)"
+        )
+
+    async def test_idempotent(self, legacy_db):
+        await _drop_plaintext_api_keys(legacy_db)
+        await _drop_plaintext_api_keys(legacy_db)
+
+        cursor = await legacy_db.execute("SELECT api_key FROM agent_instances")
+        assert (await cursor.fetchone())["api_key"] == api_key_hint("sk_secret")
@@ -0,0 +1,39 @@
+"""임베딩 영구 캐시 테스트"""
+
+from unittest.mock import patch
+
+from src.shared import embedding_cache
+from src.shared.embedding_cache import get_cached_embedding, prune_embedding_cache, store_embedding
+
+
+async def _count(db) -> int:
+    cursor = await db.execute("SELECT COUNT(*) FROM embedding_cache")
+    return (await cursor.fetchone())[0]
+
+
+class TestPruneEmbeddingCache:
+    async def test_keeps_newest_rows(self, db):
+        for i in range(5):
+            await store_embedding(db, "P", "m", f"텍스트 {i}", [0.1])
+        with patch.object(embedding_cache, "EMBEDDING_CACHE_MAX_ROWS", 2):
+            assert await prune_embedding_cache(db) == 3
+
+        assert await _count(db) == 2
+        assert await get_cached_embedding(db, "P", "m", "텍스트 4") is not None
+        assert await get_cached_embedding(db, "P", "m", "텍스트 0") is None
+
+    async def test_drops_other_models(self, db):
+        await store_embedding(db, "P", "old-model", "텍스트", [0.1])
+        await store_embedding(db, "P", "new-model", "텍스트", [0.1])
+
+        assert await prune_embedding_cache(db, keep=("P", "new-model")) == 1
+        assert await get_cached_embedding(db, "P", "new-model", "텍스트") is not None
+
+    async def test_store_prunes_periodically(self, db):
+        with patch.object(embedding_cache, "EMBEDDING_CACHE_MAX_ROWS", 2), \
+             patch.object(embedding_cache, "PRUNE_INTERVAL", 3), \
+             patch.object(embedding_cache, "_stores_since_prune", 0):
+            for i in range(3):
+                await store_embedding(db, "P", "m", f"텍스트 {i}", [0.1])
+
+        assert await _count(db) == 2
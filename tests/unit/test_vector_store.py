@@ -0,0 +1,19 @@
+"""벡터 저장소 테스트"""
+
+import uuid
+from unittest.mock import AsyncMock, patch
+
+from src.shared import vector_store
+
+
+class TestUpsertVectors:
+    async def test_splits_into_batches(self):
+        client = AsyncMock()
+        points = [(str(uuid.uuid4()), [0.1, 0.2], {"chunk_index": i}) for i in range(5)]
+        with patch("src.shared.vector_store.get_vector_store", return_value=client), \
+             patch("src.shared.vector_store.UPSERT_BATCH_SIZE", 2):
+            await vector_store.upsert_vectors(points)
+
+        sent = [call.kwargs["points"] for call in client.upsert.await_args_list]
+        assert [len(batch) for batch in sent] == [2, 2, 1]
+        assert [p.payload["chunk_index"] for batch in sent for p in batch] == list(range(5))
@@ -0,0 +1,171 @@
+"""WebhookService 테스트"""
+
+import json
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.agent import webhook
+from src.agent.webhook import WebhookService
+
+
+@pytest.fixture
+async def seed_agent_instance(db, seed_users):
+    await db.execute(
+        "INSERT INTO agent_types (id, name, developer_id) VALUES ('type-1', '테스트', 'user-1')"
+    )
+    await db.execute(
+        """INSERT INTO agent_instances (id, agent_type_id, name, owner_id, api_key, webhook_url)
+           VALUES ('inst-1', 'type-1', '테스트 에이전트', 'user-1', 'key-1', 'http://hook.test/a')"""
+    )
+    await db.commit()
+
+
+webhook_statuses: list[int] = []
+
+
+@pytest.fixture
+async def webhook_requests():
+    """공유 클라이언트를 MockTransport 클라이언트로 교체하고 수신 요청을 기록
+
+    webhook_statuses에 넣은 상태 코드를 순서대로 응답하고, 비어 있으면 200.
+    """
+    received: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(webhook_statuses.pop(0) if webhook_statuses else 200)
+
+    webhook._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield received
+    webhook_statuses.clear()
+    await webhook.close_webhook_client()
+
+
+class TestDeliver:
+    async def test_marks_delivered(self, db, seed_agent_instance, webhook_requests):
+        svc = WebhookService(db)
+        event = await svc.repo.create_webhook_event("inst-1", "memory.created", "{}")
+
+        await svc._deliver(event["id"], "http://hook.test/a", {"id": 1})
+
+        stored = await svc.repo.get_webhook_event(event["id"])
+        assert stored["status"] == "delivered"
+        assert stored["response_status"] == 200
+        assert len(webhook_requests) == 1
+
+    async def test_reuses_shared_client(self, db, seed_agent_instance, webhook_requests):
+        client = webhook.get_webhook_client()
+        svc = WebhookService(db)
+        for _ in range(2):
+            event = await svc.repo.create_webhook_event("inst-1", "memory.created", "{}")
+            await svc._deliver(event["id"], "http://hook.test/a", {})
+
+        assert webhook.get_webhook_client() is client
+        assert len(webhook_requests) == 2
+
+
+class TestFireEvent:
+    async def test_delivers_through_worker_queue(self, db, seed_agent_instance, webhook_requests):
+        svc = WebhookService(db)
+        try:
+            event = await svc.fire_event(
+                "inst-1", "memory.created", {"id": 1}, webhook_url="http://hook.test/a",
+            )
+            await webhook._delivery_queue.join()
+        finally:
+            await webhook.stop_webhook_workers()
+
+        stored = await svc.repo.get_webhook_event(event["id"])
+        assert stored["status"] == "delivered"
+        assert len(webhook_requests) == 1
+
+    async def test_without_url_does_not_start_workers(self, db, seed_agent_instance):
+        await db.execute("UPDATE agent_instances SET webhook_url = NULL WHERE id = 'inst-1'")
+        svc = WebhookService(db)
+        event = await svc.fire_event("inst-1", "memory.created", {"id": 1})
+
+        assert event["status"] == "pending"
+        assert event["next_attempt_at"] is None
+        assert webhook._workers == []
+
+
+class TestFireEvents:
+    async def test_delivers_all_through_worker_queue(self, db, seed_agent_instance, webhook_requests):
+        svc = WebhookService(db)
+        try:
+            event_ids = await svc.fire_events(
+                "inst-1",
+                [("memory.created", {"id": 1}), ("message.received", {"id": 2})],
+                webhook_url="http://hook.test/a",
+            )
+            await webhook._delivery_queue.join()
+        finally:
+            await webhook.stop_webhook_workers()
+
+        assert len(webhook_requests) == 2
+        for event_id in event_ids:
+            assert (await svc.repo.get_webhook_event(event_id))["status"] == "delivered"
+
+    async def test_without_url_skips_instance_lookup(self, db, seed_agent_instance):
+        svc = WebhookService(db)
+        with patch.object(svc.repo, "get_agent_instance", AsyncMock()) as get_instance, \
+             patch.object(db, "commit", wraps=db.commit) as commit:
+            event_ids = await svc.fire_events(
+                "inst-1", [("memory.created", {"id": i}) for i in range(3)], webhook_url=None,
+            )
+
+        get_instance.assert_not_awaited()
+        assert commit.await_count == 1
+        assert len(event_ids) == 3
+        assert webhook._workers == []
+
+
+class TestRetryOutbox:
+    async def test_failure_schedules_retry(self, db, seed_agent_instance, webhook_requests):
+        webhook_statuses.append(500)
+        svc = WebhookService(db)
+        event = await svc.repo.create_webhook_event("inst-1", "memory.created", "{}")
+
+        await svc._deliver(event["id"], "http://hook.test/a", {})
+
+        stored = await svc.repo.get_webhook_event(event["id"])
+        assert stored["status"] == "failed"
+        assert stored["attempts"] == 1
+        assert stored["next_attempt_at"] is not None
+
+    async def test_dispatch_redelivers_due_events(self, db, seed_agent_instance, webhook_requests):
+        svc = WebhookService(db)
+        event = await svc.repo.create_webhook_event("inst-1", "memory.created", '{"id": 1}')
+        await svc.repo.update_webhook_event(
+            event["id"], status="failed", attempts=1, next_attempt_at=webhook._utc_iso(-1),
+        )
+
+        assert await svc.dispatch_due_events() == 1
+
+        stored = await svc.repo.get_webhook_event(event["id"])
+        assert stored["status"] == "delivered"
+        assert stored["attempts"] == 2
+        assert json.loads(webhook_requests[0].content) == {"id": 1}
+
+    async def test_dispatch_skips_leased_and_unscheduled(self, db, seed_agent_instance, webhook_requests):
+        svc = WebhookService(db)
+        await svc.repo.create_webhook_event("inst-1", "memory.created", "{}")
+        await svc.repo.create_webhook_event(
+            "inst-1", "memory.created", "{}", next_attempt_at=webhook._utc_iso(60),
+        )
+
+        assert await svc.dispatch_due_events() == 0
+        assert webhook_requests == []
+
+    async def test_exhausted_clears_schedule(self, db, seed_agent_instance, webhook_requests):
+        webhook_statuses.append(500)
+        svc = WebhookService(db)
+        event = await svc.repo.create_webhook_event("inst-1", "memory.created", "{}")
+
+        await svc._deliver(event["id"], "http://hook.test/a", {}, attempt=webhook.MAX_ATTEMPTS)
+
+        stored = await svc.repo.get_webhook_event(event["id"])
+        assert stored["status"] == "failed"
+        assert stored["next_attempt_at"] is None